@@ -0,0 +1,20 @@
+"""
+Gunicorn configuration for the Project Singularity API
+Runs the FastAPI app on multiple uvicorn (uvloop + httptools) worker processes:
+
+    gunicorn api.main:app -c api/gunicorn_conf.py
+"""
+
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+# UvicornWorker keeps uvicorn's WebSocket ping defaults (20s interval / 20s timeout),
+# which replace the old application-level keep-alive messages
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Workers only share generation state through Redis, so without REDIS_URL
+# default to a single worker
+workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() if os.getenv("REDIS_URL") else 1))
+
+loglevel = os.getenv("LOG_LEVEL", "info")
+keepalive = 5
@@ -6,16 +6,27 @@ FastAPI backend for the Text-to-APK engine with real-time WebSocket support
 
 import os
 import asyncio
+import time
 import logging
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
+import logging.handlers
+import queue
+from typing import Dict, List, Optional, Any, Tuple, Set, Deque, DefaultDict, Callable, Awaitable, Annotated
+from datetime import datetime, timezone
 import uuid
-import json
+from dataclasses import dataclass, field, fields, asdict
+from collections import deque, defaultdict
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
-from pydantic import BaseModel, Field
+from fastapi.responses import FileResponse, ORJSONResponse, Response
+from pydantic import BaseModel, Field, StringConstraints
+import httpx
+import orjson
+import redis.asyncio as aioredis
 import uvicorn
 
 # Import our core engine
@@ -23,38 +34,122 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.text_to_apk_engine import TextToAPKEngine, AppFramework, AppCategory
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging: handlers on the event loop only enqueue records, a
+# background listener thread does the actual (blocking) stream writes.
+# force=True replaces the stream handler installed when the engine is imported
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(
+    log_queue,
+    logging.StreamHandler(),
+    respect_handler_level=True
+)
+logging.basicConfig(level=logging.INFO, handlers=[logging.handlers.QueueHandler(log_queue)], force=True)
 logger = logging.getLogger(__name__)
 
+# Admission control for APK builds (per worker process)
+MAX_CONCURRENT_BUILDS = int(os.getenv("MAX_CONCURRENT_BUILDS", "4"))
+MAX_QUEUED_BUILDS = int(os.getenv("MAX_QUEUED_BUILDS", "32"))
+
+# Active generations that stop reporting progress (crashed build, failed run)
+# are moved to history by a periodic reaper
+GENERATION_MAX_AGE_SECONDS = int(os.getenv("GENERATION_MAX_AGE_SECONDS", "1800"))
+REAPER_INTERVAL_SECONDS = int(os.getenv("REAPER_INTERVAL_SECONDS", "60"))
+# Queued ones too: a worker that crashed before starting them would otherwise leave them forever
+REAPABLE_STATUSES = frozenset({"queued", "processing", "failed"})
+
+# WebSocket keep-alive uses protocol-level ping frames sent by uvicorn
+WS_PING_INTERVAL = float(os.getenv("WS_PING_INTERVAL", "20"))
+WS_PING_TIMEOUT = float(os.getenv("WS_PING_TIMEOUT", "20"))
+
+# Generation state lives in Redis when REDIS_URL is set so every worker shares it;
+# otherwise fall back to in-process dicts (single worker / local demo only)
+REDIS_URL = os.getenv("REDIS_URL")
+HISTORY_TTL_SECONDS = int(os.getenv("HISTORY_TTL_SECONDS", "86400"))
+
+# Optional SQLite file shared by workers so identical LLM requests are answered once
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared resources on startup and release them on shutdown"""
+    log_listener.start()
+    
+    # One pooled HTTP/2 client for all outbound calls: concurrent LLM requests
+    # are multiplexed over kept-alive connections instead of new TLS handshakes
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        timeout=httpx.Timeout(60.0)
+    )
+    app.state.engine = TextToAPKEngine(
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        http_client=app.state.http,
+        cache_path=LLM_CACHE_PATH,
+        max_concurrent_builds=MAX_CONCURRENT_BUILDS
+    )
+    
+    # APK builds are CPU/subprocess bound: run them in worker processes so the
+    # event loop keeps serving requests and WebSockets (spawn: never fork a running loop)
+    app.state.build_pool = ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn")
+    )
+    
+    if REDIS_URL:
+        app.state.redis = aioredis.from_url(REDIS_URL, decode_responses=True)
+        app.state.store = RedisGenerationStore(app.state.redis)
+        logger.info("Using Redis generation store")
+    else:
+        app.state.redis = None
+        app.state.store = InMemoryGenerationStore()
+        logger.info("Using in-memory generation store")
+    
+    app.state.reaper = asyncio.create_task(reap_stale_generations())
+    
+    yield
+    
+    app.state.reaper.cancel()
+    if app.state.redis is not None:
+        await app.state.redis.aclose()
+    await app.state.http.aclose()
+    app.state.engine.close()
+    app.state.build_pool.shutdown(wait=False, cancel_futures=True)
+    log_listener.stop()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Project Singularity API",
     description="Revolutionary Text-to-APK Engine API",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
-# Add CORS middleware
+# Add CORS middleware: explicit origins/methods/headers (comma separated
+# CORS_ORIGINS, defaults to the local React dev server) and cached preflights
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
+    if origin.strip()
+]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["authorization", "content-type"],
+    max_age=86400,
 )
 
-# Initialize the Text-to-APK engine
-engine = TextToAPKEngine(openai_api_key=os.getenv("OPENAI_API_KEY"))
-
-# In-memory storage for demo (use Redis/PostgreSQL in production)
-active_generations = {}
-generation_history = {}
-
 class GenerationRequest(BaseModel):
     """Request model for APK generation"""
-    prompt: str = Field(..., description="Natural language description of the desired app")
+    # Stripped before the length checks so whitespace padding can't satisfy min_length
+    prompt: Annotated[str, StringConstraints(strip_whitespace=True, min_length=10, max_length=8192)] = Field(
+        ..., description="Natural language description of the desired app"
+    )
     user_preferences: Optional[Dict[str, Any]] = Field(None, description="User preferences for framework, style, etc.")
     user_id: Optional[str] = Field(None, description="Optional user identifier")
     
@@ -74,29 +169,363 @@ class GenerationStatus(BaseModel):
     estimated_remaining: Optional[int] = None
     error: Optional[str] = None
 
+@dataclass(slots=True)
+class Generation:
+    """Tracked state of a single APK generation"""
+    id: str
+    prompt: str
+    user_preferences: Optional[Dict[str, Any]] = None
+    user_id: Optional[str] = None
+    status: str = "queued"
+    progress: int = 0
+    current_stage: str = "Initializing"
+    # Timestamps are epoch nanoseconds; ISO strings are only built for responses
+    created_at_ns: int = field(default_factory=time.time_ns)
+    updated_at_ns: Optional[int] = None
+    completed_at_ns: Optional[int] = None
+    estimated_time: Optional[int] = None
+    estimated_remaining: Optional[int] = None
+    error: Optional[str] = None
+    apk_path: Optional[str] = None
+    app_name: Optional[str] = None
+    framework: Optional[str] = None
+    build_time: Optional[float] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """API representation with ISO-8601 UTC timestamps"""
+        data = asdict(self)
+        for key in ("created_at", "updated_at", "completed_at"):
+            timestamp_ns = data.pop(f"{key}_ns")
+            data[key] = None if timestamp_ns is None else datetime.fromtimestamp(timestamp_ns / 1e9, tz=timezone.utc).isoformat()
+        return data
+
+class APKFileResponse(FileResponse):
+    """FileResponse with larger read chunks for multi-megabyte APKs"""
+    chunk_size = 1024 * 1024
+
+# Plain progress updates have a fixed shape: serialize the skeleton once and
+# splice in the varying fields (stages come from a small fixed vocabulary)
+_STATUS_UPDATE_TEMPLATE = b'{"type":"status_update","status":%b,"progress":%d,"current_stage":%b,"error":null}'
+
+@lru_cache(maxsize=256)
+def _json_string(value: str) -> bytes:
+    return orjson.dumps(value)
+
+def encode_update(data: Dict[str, Any]) -> bytes:
+    """
+    Serialize a WebSocket update, using the status template when possible
+    """
+    if data.get("type") == "status_update" and data.get("error") is None:
+        return _STATUS_UPDATE_TEMPLATE % (
+            _json_string(data["status"]),
+            data["progress"],
+            _json_string(data["current_stage"])
+        )
+    return orjson.dumps(data, default=str)
+
 class WebSocketManager:
     """Manage WebSocket connections for real-time updates"""
     
     def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
+        # Several clients (e.g. the originating page and a dashboard) may watch one generation
+        self.active_connections: Dict[str, Set[WebSocket]] = {}
     
     async def connect(self, websocket: WebSocket, generation_id: str):
         await websocket.accept()
-        self.active_connections[generation_id] = websocket
+        self.active_connections.setdefault(generation_id, set()).add(websocket)
         logger.info(f"WebSocket connected for generation {generation_id}")
     
-    def disconnect(self, generation_id: str):
-        if generation_id in self.active_connections:
+    def disconnect(self, generation_id: str, websocket: WebSocket):
+        subscribers = self.active_connections.get(generation_id)
+        if subscribers is None or websocket not in subscribers:
+            return
+        subscribers.discard(websocket)
+        if not subscribers:
             del self.active_connections[generation_id]
-            logger.info(f"WebSocket disconnected for generation {generation_id}")
+        logger.info(f"WebSocket disconnected for generation {generation_id}")
+    
+    async def send_update(self, generation_id: str, payload: bytes):
+        subscribers = self.active_connections.get(generation_id)
+        if not subscribers:
+            return
+        
+        # Write to every subscriber concurrently; one dead client must not block the rest
+        targets = list(subscribers)
+        results = await asyncio.gather(
+            *(websocket.send_bytes(payload) for websocket in targets),
+            return_exceptions=True
+        )
+        for websocket, result in zip(targets, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to send WebSocket update: {result}")
+                self.disconnect(generation_id, websocket)
+
+class InMemoryGenerationStore:
+    """Process-local generation state (not shared between workers)"""
     
-    async def send_update(self, generation_id: str, data: Dict[str, Any]):
-        if generation_id in self.active_connections:
-            try:
-                await self.active_connections[generation_id].send_text(json.dumps(data))
-            except Exception as e:
-                logger.error(f"Failed to send WebSocket update: {e}")
-                self.disconnect(generation_id)
+    def __init__(self, max_history: int = 10_000, max_user_history: int = 1000):
+        self.active_generations: Dict[str, Generation] = {}
+        self.generation_history: Dict[str, Generation] = {}
+        # Newest-first ids, so /history never has to re-sort; maxlen bounds memory
+        self.history_order: Deque[str] = deque(maxlen=max_history)
+        self.history_by_user: DefaultDict[str, Deque[str]] = defaultdict(lambda: deque(maxlen=max_user_history))
+    
+    async def create(self, generation: Generation):
+        self.active_generations[generation.id] = generation
+    
+    async def get_active(self, generation_id: str) -> Optional[Generation]:
+        return self.active_generations.get(generation_id)
+    
+    async def get_completed(self, generation_id: str) -> Optional[Generation]:
+        return self.generation_history.get(generation_id)
+    
+    async def update(self, generation_id: str, fields: Dict[str, Any]) -> bool:
+        generation = self.active_generations.get(generation_id)
+        if generation is None:
+            return False
+        for key, value in fields.items():
+            setattr(generation, key, value)
+        return True
+    
+    async def finish(self, generation_id: str, fields: Dict[str, Any]) -> bool:
+        generation = self.active_generations.pop(generation_id, None)
+        if generation is None:
+            # Already reaped or finished elsewhere
+            return False
+        for key, value in fields.items():
+            setattr(generation, key, value)
+        
+        if len(self.history_order) == self.history_order.maxlen:
+            self.generation_history.pop(self.history_order[-1], None)
+        self.generation_history[generation_id] = generation
+        self.history_order.appendleft(generation_id)
+        if generation.user_id:
+            self.history_by_user[generation.user_id].appendleft(generation_id)
+        return True
+    
+    async def history(self, limit: int, user_id: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+        if user_id:
+            order = self.history_by_user.get(user_id, ())
+        else:
+            order = self.history_order
+        
+        # Ids are kept newest first; user deques may still name evicted entries
+        history = []
+        for gid in order:
+            if len(history) >= limit:
+                break
+            generation = self.generation_history.get(gid)
+            if generation is not None:
+                history.append(generation.to_dict())
+        
+        return history, len(order)
+    
+    async def counts(self) -> Tuple[int, int]:
+        return len(self.active_generations), len(self.generation_history)
+    
+    async def stale(self, cutoff_ns: int) -> List[str]:
+        return [
+            generation_id for generation_id, generation in self.active_generations.items()
+            if generation.status in REAPABLE_STATUSES
+            and (generation.updated_at_ns or generation.created_at_ns) < cutoff_ns
+        ]
+
+class RedisGenerationStore:
+    """
+    Redis-backed generation state shared by all API workers
+    
+    Active generations live in ``gen:active:{id}`` hashes; finished ones move to
+    ``gen:done:{id}`` with a TTL and are indexed by creation time in sorted sets.
+    A counter tracks active generations so health checks never scan keys.
+    """
+    
+    HISTORY_KEY = "gen:history:by_time"
+    ACTIVE_COUNT_KEY = "gen:count:active"
+    # Exists check and write in one step, so a hash finished or reaped meanwhile
+    # isn't recreated as a partial one
+    UPDATE_IF_ACTIVE = """
+if redis.call('exists', KEYS[1]) == 1 then
+    redis.call('hset', KEYS[1], unpack(ARGV))
+    return 1
+end
+return 0
+"""
+    # Final fields, move to history and index in one step, so the worker and the
+    # reaper can't both finish a generation (the last one overwriting the first)
+    # KEYS: active hash, done hash, active counter, history indexes...
+    # ARGV: done TTL, expired-before score, generation id, created-at score, fields...
+    FINISH_IF_ACTIVE = """
+if redis.call('exists', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('hset', KEYS[1], unpack(ARGV, 5))
+redis.call('rename', KEYS[1], KEYS[2])
+redis.call('expire', KEYS[2], ARGV[1])
+redis.call('decr', KEYS[3])
+for i = 4, #KEYS do
+    redis.call('zadd', KEYS[i], ARGV[4], ARGV[3])
+    redis.call('zremrangebyscore', KEYS[i], '-inf', ARGV[2])
+end
+return 1
+"""
+    FIELDS = frozenset(spec.name for spec in fields(Generation))
+    
+    def __init__(self, redis: aioredis.Redis, history_ttl: int = HISTORY_TTL_SECONDS):
+        self.redis = redis
+        self.history_ttl = history_ttl
+        self._update_if_active = redis.register_script(self.UPDATE_IF_ACTIVE)
+        self._finish_if_active = redis.register_script(self.FINISH_IF_ACTIVE)
+    
+    @staticmethod
+    def _encode(fields: Dict[str, Any]) -> Dict[str, bytes]:
+        # Hash values are flat strings: JSON-encode each one so ints/None/dicts
+        # round-trip (orjson writes datetimes as ISO strings)
+        return {key: orjson.dumps(value) for key, value in fields.items()}
+    
+    @classmethod
+    def _decode(cls, raw: Dict[str, str]) -> Optional[Generation]:
+        if not raw:
+            return None
+        data = {key: orjson.loads(value) for key, value in raw.items() if key in cls.FIELDS}
+        if "id" not in data or "prompt" not in data:
+            # A partial hash (e.g. from an older writer) is not a usable generation
+            return None
+        return Generation(**data)
+    
+    async def create(self, generation: Generation):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(f"gen:active:{generation.id}", mapping=self._encode(asdict(generation)))
+            pipe.incr(self.ACTIVE_COUNT_KEY)
+            await pipe.execute()
+    
+    async def get_active(self, generation_id: str) -> Optional[Generation]:
+        return self._decode(await self.redis.hgetall(f"gen:active:{generation_id}"))
+    
+    async def get_completed(self, generation_id: str) -> Optional[Generation]:
+        return self._decode(await self.redis.hgetall(f"gen:done:{generation_id}"))
+    
+    async def update(self, generation_id: str, fields: Dict[str, Any]) -> bool:
+        args = [item for pair in self._encode(fields).items() for item in pair]
+        return bool(await self._update_if_active(keys=[f"gen:active:{generation_id}"], args=args))
+    
+    async def finish(self, generation_id: str, fields: Dict[str, Any]) -> bool:
+        active_key = f"gen:active:{generation_id}"
+        # Both are set at creation and never change, so reading them first is race-free
+        raw_user_id, raw_created_at_ns = await self.redis.hmget(active_key, "user_id", "created_at_ns")
+        if raw_created_at_ns is None:
+            # Already reaped or finished by another worker
+            return False
+        
+        user_id = orjson.loads(raw_user_id) if raw_user_id is not None else None
+        index_keys = [self.HISTORY_KEY]
+        if user_id:
+            index_keys.append(f"gen:history:user:{user_id}")
+        
+        args = [
+            self.history_ttl,
+            time.time() - self.history_ttl,
+            generation_id,
+            orjson.loads(raw_created_at_ns) / 1e9,
+            *(item for pair in self._encode(fields).items() for item in pair)
+        ]
+        keys = [active_key, f"gen:done:{generation_id}", self.ACTIVE_COUNT_KEY, *index_keys]
+        return bool(await self._finish_if_active(keys=keys, args=args))
+    
+    async def history(self, limit: int, user_id: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+        index_key = f"gen:history:user:{user_id}" if user_id else self.HISTORY_KEY
+        
+        async with self.redis.pipeline(transaction=True) as pipe:
+            # Drop ids whose hashes have expired so they aren't counted
+            pipe.zremrangebyscore(index_key, "-inf", time.time() - self.history_ttl)
+            pipe.zrevrangebyscore(index_key, "+inf", "-inf", start=0, num=limit)
+            pipe.zcard(index_key)
+            _, generation_ids, total = await pipe.execute()
+        
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for generation_id in generation_ids:
+                pipe.hgetall(f"gen:done:{generation_id}")
+            results = await pipe.execute()
+        
+        history = [gen.to_dict() for gen in map(self._decode, results) if gen is not None]
+        return history, total
+    
+    async def counts(self) -> Tuple[int, int]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.get(self.ACTIVE_COUNT_KEY)
+            pipe.zcard(self.HISTORY_KEY)
+            active, completed = await pipe.execute()
+        return max(int(active or 0), 0), completed
+    
+    async def stale(self, cutoff_ns: int) -> List[str]:
+        generation_ids = []
+        async for key in self.redis.scan_iter(match="gen:active:*", count=1000):
+            status, updated_at_ns, created_at_ns = map(
+                lambda raw: orjson.loads(raw) if raw is not None else None,
+                await self.redis.hmget(key, "status", "updated_at_ns", "created_at_ns")
+            )
+            if status in REAPABLE_STATUSES and (updated_at_ns or created_at_ns or 0) < cutoff_ns:
+                generation_ids.append(key.split(":", 2)[2])
+        return generation_ids
+
+class UpdateCoalescer:
+    """
+    Collapse bursts of progress updates into at most one send per interval per generation
+    
+    The latest state always wins; terminal states bypass the debounce so clients
+    see the final event immediately.
+    """
+    
+    TERMINAL_STATUSES = frozenset({"completed", "failed"})
+    
+    def __init__(self, send: Callable[[str, Dict[str, Any]], Awaitable[None]], interval: float = 0.25):
+        self.send = send
+        self.interval = interval
+        self.last_sent: Dict[str, float] = {}
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.timers: Dict[str, asyncio.TimerHandle] = {}
+        self.flushing: Dict[str, asyncio.Task] = {}
+    
+    async def push(self, generation_id: str, data: Dict[str, Any]):
+        if data.get("status") in self.TERMINAL_STATUSES:
+            timer = self.timers.pop(generation_id, None)
+            if timer is not None:
+                timer.cancel()
+            self.pending.pop(generation_id, None)
+            self.last_sent.pop(generation_id, None)
+            # Never let a stale progress update land after the final event
+            flush_task = self.flushing.get(generation_id)
+            if flush_task is not None:
+                await asyncio.shield(flush_task)
+            await self.send(generation_id, data)
+            return
+        
+        loop = asyncio.get_running_loop()
+        elapsed = loop.time() - self.last_sent.get(generation_id, float("-inf"))
+        if elapsed >= self.interval and generation_id not in self.timers:
+            self.last_sent[generation_id] = loop.time()
+            await self.send(generation_id, data)
+            return
+        
+        self.pending[generation_id] = data
+        if generation_id not in self.timers:
+            self.timers[generation_id] = loop.call_later(self.interval - elapsed, self._flush, generation_id)
+    
+    def _flush(self, generation_id: str):
+        self.timers.pop(generation_id, None)
+        data = self.pending.pop(generation_id, None)
+        if data is None:
+            return
+        
+        self.last_sent[generation_id] = asyncio.get_running_loop().time()
+        flush_task = asyncio.create_task(self.send(generation_id, data))
+        self.flushing[generation_id] = flush_task
+        flush_task.add_done_callback(lambda task: self._flushed(generation_id, task))
+    
+    def _flushed(self, generation_id: str, task: asyncio.Task):
+        if self.flushing.get(generation_id) is task:
+            del self.flushing[generation_id]
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Failed to deliver coalesced update: {task.exception()}")
 
 # Initialize WebSocket manager
 websocket_manager = WebSocketManager()
@@ -122,26 +551,22 @@ async def generate_apk(request: GenerationRequest, background_tasks: BackgroundT
     """
     Generate APK from natural language prompt
     """
+    # Shed load early instead of queueing unbounded work behind the engine's build slots
+    if app.state.engine.builds_waiting >= MAX_QUEUED_BUILDS:
+        raise HTTPException(status_code=503, detail="Too many generations in progress, please retry later")
+    
     try:
         # Generate unique ID for this generation
         generation_id = str(uuid.uuid4())
         
-        # Validate request
-        if not request.prompt or len(request.prompt.strip()) < 10:
-            raise HTTPException(status_code=400, detail="Prompt must be at least 10 characters long")
-        
         # Initialize generation tracking
-        active_generations[generation_id] = {
-            "id": generation_id,
-            "prompt": request.prompt,
-            "user_preferences": request.user_preferences,
-            "user_id": request.user_id,
-            "status": "queued",
-            "progress": 0,
-            "current_stage": "Initializing",
-            "created_at": datetime.utcnow(),
-            "estimated_time": 180  # 3 minutes default
-        }
+        await app.state.store.create(Generation(
+            id=generation_id,
+            prompt=request.prompt,
+            user_preferences=request.user_preferences,
+            user_id=request.user_id,
+            estimated_time=180  # 3 minutes default
+        ))
         
         # Start background generation task
         background_tasks.add_task(process_generation, generation_id, request)
@@ -164,52 +589,66 @@ async def get_generation_status(generation_id: str):
     """
     Get the current status of an APK generation
     """
-    if generation_id not in active_generations and generation_id not in generation_history:
-        raise HTTPException(status_code=404, detail="Generation not found")
+    store = app.state.store
     
     # Check active generations first
-    if generation_id in active_generations:
-        gen_data = active_generations[generation_id]
+    generation = await store.get_active(generation_id)
+    if generation is not None:
         return GenerationStatus(
             generation_id=generation_id,
-            status=gen_data["status"],
-            progress=gen_data["progress"],
-            current_stage=gen_data["current_stage"],
-            estimated_remaining=gen_data.get("estimated_remaining"),
-            error=gen_data.get("error")
+            status=generation.status,
+            progress=generation.progress,
+            current_stage=generation.current_stage,
+            estimated_remaining=generation.estimated_remaining,
+            error=generation.error
         )
     
     # Check completed generations
-    if generation_id in generation_history:
-        gen_data = generation_history[generation_id]
+    generation = await store.get_completed(generation_id)
+    if generation is not None:
         return GenerationStatus(
             generation_id=generation_id,
-            status=gen_data["status"],
-            progress=100 if gen_data["status"] == "completed" else 0,
-            current_stage="Completed" if gen_data["status"] == "completed" else "Failed",
-            error=gen_data.get("error")
+            status=generation.status,
+            progress=100 if generation.status == "completed" else 0,
+            current_stage="Completed" if generation.status == "completed" else "Failed",
+            error=generation.error
         )
+    
+    raise HTTPException(status_code=404, detail="Generation not found")
 
 @app.get("/download/{generation_id}")
-async def download_apk(generation_id: str):
+async def download_apk(generation_id: str, request: Request):
     """
     Download the generated APK file
     """
-    if generation_id not in generation_history:
+    generation = await app.state.store.get_completed(generation_id)
+    if generation is None:
         raise HTTPException(status_code=404, detail="Generation not found or not completed")
     
-    gen_data = generation_history[generation_id]
-    
-    if gen_data["status"] != "completed":
+    if generation.status != "completed":
         raise HTTPException(status_code=400, detail="APK generation not completed")
     
-    if "apk_path" not in gen_data or not os.path.exists(gen_data["apk_path"]):
+    if generation.apk_path is None:
+        raise HTTPException(status_code=404, detail="APK file not found")
+    try:
+        stat_result = os.stat(generation.apk_path)
+    except OSError:
         raise HTTPException(status_code=404, detail="APK file not found")
     
-    return FileResponse(
-        path=gen_data["apk_path"],
-        filename=f"{gen_data['app_name']}.apk",
-        media_type="application/vnd.android.package-archive"
+    # Built APKs never change in place, so mtime + size identify the content
+    headers = {
+        "ETag": f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"',
+        "Cache-Control": "private, max-age=3600"
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    
+    return APKFileResponse(
+        path=generation.apk_path,
+        filename=f"{generation.app_name}.apk",
+        media_type="application/vnd.android.package-archive",
+        stat_result=stat_result,
+        headers=headers
     )
 
 @app.websocket("/ws/{generation_id}")
@@ -219,92 +658,131 @@ async def websocket_endpoint(websocket: WebSocket, generation_id: str):
     """
     await websocket_manager.connect(websocket, generation_id)
     
+    pubsub = None
+    relay_task = None
+    
     try:
+        # With Redis, updates may be produced by any worker: subscribe to the
+        # generation's channel (before reading the initial status so nothing is missed)
+        if app.state.redis is not None:
+            pubsub = app.state.redis.pubsub()
+            await pubsub.subscribe(f"gen:events:{generation_id}")
+            relay_task = asyncio.create_task(relay_generation_events(pubsub, websocket))
+        
         # Send initial status if generation exists
-        if generation_id in active_generations:
-            gen_data = active_generations[generation_id]
-            await websocket_manager.send_update(generation_id, {
+        generation = await app.state.store.get_active(generation_id)
+        if generation is not None:
+            await websocket.send_bytes(encode_update({
                 "type": "status_update",
-                "status": gen_data["status"],
-                "progress": gen_data["progress"],
-                "current_stage": gen_data["current_stage"]
-            })
+                "status": generation.status,
+                "progress": generation.progress,
+                "current_stage": generation.current_stage
+            }))
         
-        # Keep connection alive
+        # Keep-alive is handled by protocol-level ping/pong frames in uvicorn,
+        # so just wait for the client to go away
         while True:
-            try:
-                # Wait for any message (ping/pong)
-                await asyncio.wait_for(websocket.receive_text(), timeout=30.0)
-            except asyncio.TimeoutError:
-                # Send ping to keep connection alive
-                await websocket.send_text(json.dumps({"type": "ping"}))
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
                 
     except WebSocketDisconnect:
-        websocket_manager.disconnect(generation_id)
+        websocket_manager.disconnect(generation_id, websocket)
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
-        websocket_manager.disconnect(generation_id)
+        websocket_manager.disconnect(generation_id, websocket)
+    finally:
+        if relay_task is not None:
+            relay_task.cancel()
+        if pubsub is not None:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+
+async def relay_generation_events(pubsub, websocket: WebSocket):
+    """
+    Forward events published on a generation's Redis channel to a local WebSocket
+    """
+    try:
+        async for message in pubsub.listen():
+            if message["type"] == "message":
+                # Payload is already serialized JSON
+                await websocket.send_bytes(message["data"].encode())
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to relay generation events: {e}")
 
 @app.get("/history")
 async def get_generation_history(limit: int = 10, user_id: Optional[str] = None):
     """
     Get generation history (optionally filtered by user)
     """
-    history = list(generation_history.values())
-    
-    if user_id:
-        history = [gen for gen in history if gen.get("user_id") == user_id]
-    
-    # Sort by creation time (newest first)
-    history.sort(key=lambda x: x.get("created_at", datetime.min), reverse=True)
+    history, total = await app.state.store.history(limit, user_id)
     
     return {
-        "generations": history[:limit],
-        "total": len(history)
+        "generations": history,
+        "total": total
     }
 
+# Framework and category listings are derived from immutable enums, so they are
+# serialized once at import time and served as-is
+_CATALOG_HEADERS = {"Cache-Control": "public, max-age=3600"}
+
+@lru_cache(maxsize=None)
+def _label(value: str) -> str:
+    """Human readable label for an enum value"""
+    return value.replace("_", " ").title()
+
+_FRAMEWORKS_PAYLOAD = orjson.dumps({
+    "frameworks": [
+        {
+            "id": framework.value,
+            "name": _label(framework.value),
+            "description": f"{_label(framework.value)} development framework"
+        }
+        for framework in AppFramework
+    ]
+})
+
+_CATEGORIES_PAYLOAD = orjson.dumps({
+    "categories": [
+        {
+            "id": category.value,
+            "name": _label(category.value),
+            "description": f"{_label(category.value)} applications"
+        }
+        for category in AppCategory
+    ]
+})
+
 @app.get("/frameworks")
 async def get_supported_frameworks():
     """
     Get list of supported development frameworks
     """
-    return {
-        "frameworks": [
-            {
-                "id": framework.value,
-                "name": framework.value.replace("_", " ").title(),
-                "description": f"{framework.value.replace('_', ' ').title()} development framework"
-            }
-            for framework in AppFramework
-        ]
-    }
+    return Response(content=_FRAMEWORKS_PAYLOAD, media_type="application/json", headers=_CATALOG_HEADERS)
 
 @app.get("/categories")
 async def get_app_categories():
     """
     Get list of supported app categories
     """
-    return {
-        "categories": [
-            {
-                "id": category.value,
-                "name": category.value.title(),
-                "description": f"{category.value.title()} applications"
-            }
-            for category in AppCategory
-        ]
-    }
+    return Response(content=_CATEGORIES_PAYLOAD, media_type="application/json", headers=_CATALOG_HEADERS)
 
 @app.get("/health")
 async def health_check():
     """
     Health check endpoint for monitoring
     """
+    active_count, completed_count = await app.state.store.counts()
+    
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
-        "active_generations": len(active_generations),
-        "completed_generations": len(generation_history),
+        "active_generations": active_count,
+        "completed_generations": completed_count,
+        "running_builds": app.state.engine.builds_running,
+        "queued_builds": app.state.engine.builds_waiting,
         "engine_status": "operational"
     }
 
@@ -318,44 +796,28 @@ async def process_generation(generation_id: str, request: GenerationRequest):
         # Update status to processing
         await update_generation_status(generation_id, "processing", 10, "Analyzing prompt")
         
-        # Simulate processing stages with real engine calls
-        stages = [
-            ("analyzing", 20, "Analyzing prompt and extracting requirements"),
-            ("architecting", 40, "Generating application architecture"),
-            ("coding", 70, "Generating source code"),
-            ("building", 90, "Building APK file"),
-            ("finalizing", 95, "Finalizing and optimizing")
-        ]
-        
-        for stage, progress, description in stages:
-            await update_generation_status(generation_id, "processing", progress, description)
-            await asyncio.sleep(2)  # Simulate processing time
-        
-        # Call the actual engine
-        result = await engine.generate_apk_from_text(
+        # Call the actual engine; it reports progress as each stage starts
+        result = await app.state.engine.generate_apk_from_text(
             request.prompt, 
-            request.user_preferences
+            request.user_preferences,
+            progress_cb=lambda progress, stage: update_generation_status(generation_id, "processing", progress, stage),
+            build_executor=app.state.build_pool
         )
         
         if result["success"]:
-            # Move to completed
-            gen_data = active_generations[generation_id]
-            gen_data.update({
+            # Move to completed history
+            await app.state.store.finish(generation_id, {
                 "status": "completed",
                 "progress": 100,
                 "current_stage": "Completed",
-                "completed_at": datetime.utcnow(),
+                "completed_at_ns": time.time_ns(),
                 "apk_path": result["apk_path"],
                 "app_name": result["app_specification"]["name"],
                 "framework": result["app_specification"]["framework"],
                 "build_time": result["metadata"]["generation_time"]
             })
             
-            # Move to history
-            generation_history[generation_id] = gen_data
-            del active_generations[generation_id]
-            
-            await websocket_manager.send_update(generation_id, {
+            await publish_update(generation_id, {
                 "type": "completed",
                 "status": "completed",
                 "progress": 100,
@@ -391,20 +853,19 @@ async def update_generation_status(generation_id: str, status: str, progress: in
     """
     Update generation status and notify WebSocket clients
     """
-    if generation_id in active_generations:
-        gen_data = active_generations[generation_id]
-        gen_data.update({
-            "status": status,
-            "progress": progress,
-            "current_stage": stage,
-            "updated_at": datetime.utcnow()
-        })
-        
-        if error:
-            gen_data["error"] = error
-        
+    fields = {
+        "status": status,
+        "progress": progress,
+        "current_stage": stage,
+        "updated_at_ns": time.time_ns()
+    }
+    
+    if error:
+        fields["error"] = error
+    
+    if await app.state.store.update(generation_id, fields):
         # Send WebSocket update
-        await websocket_manager.send_update(generation_id, {
+        await publish_update(generation_id, {
             "type": "status_update",
             "status": status,
             "progress": progress,
@@ -412,12 +873,68 @@ async def update_generation_status(generation_id: str, status: str, progress: in
             "error": error
         })
 
+async def reap_stale_generations():
+    """
+    Periodically move generations that stopped making progress into history
+    """
+    while True:
+        await asyncio.sleep(REAPER_INTERVAL_SECONDS)
+        try:
+            store = app.state.store
+            cutoff_ns = time.time_ns() - GENERATION_MAX_AGE_SECONDS * 1_000_000_000
+            for generation_id in await store.stale(cutoff_ns):
+                generation = await store.get_active(generation_id)
+                if generation is None:
+                    continue
+                
+                fields = {"status": "failed", "completed_at_ns": time.time_ns()}
+                if generation.status != "failed":
+                    fields.update(current_stage="Generation failed", error="Generation timed out")
+                if not await store.finish(generation_id, fields):
+                    # Completed or reaped by another worker in the meantime
+                    continue
+                
+                await publish_update(generation_id, {
+                    "type": "status_update",
+                    "status": "failed",
+                    "progress": 0,
+                    "current_stage": "Generation failed",
+                    "error": generation.error or "Generation timed out"
+                })
+                logger.warning(f"Reaped stale generation {generation_id}")
+        except Exception as e:
+            logger.error(f"Failed to reap stale generations: {e}")
+
+async def publish_update(generation_id: str, data: Dict[str, Any]):
+    """
+    Deliver an update to every WebSocket watching a generation (rate limited)
+    """
+    await update_coalescer.push(generation_id, data)
+
+async def deliver_update(generation_id: str, data: Dict[str, Any]):
+    """
+    Send an update immediately through Redis or the local WebSocket manager
+    """
+    payload = encode_update(data)
+    if app.state.redis is not None:
+        # Fan out through Redis so the worker holding the socket receives it
+        await app.state.redis.publish(f"gen:events:{generation_id}", payload)
+    else:
+        await websocket_manager.send_update(generation_id, payload)
+
+# Coalesce fine-grained progress into at most one WebSocket send per 250 ms
+update_coalescer = UpdateCoalescer(deliver_update)
+
 if __name__ == "__main__":
-    # Run the server
+    # Run the server (production deployments use gunicorn with gunicorn_conf.py)
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() if REDIS_URL else 1)),
+        loop="uvloop",
+        http="httptools",
+        ws_ping_interval=WS_PING_INTERVAL,
+        ws_ping_timeout=WS_PING_TIMEOUT,
         log_level="info"
     )
@@ -4,16 +4,26 @@ Advanced AI Prompt Engineering System for Project Singularity
 Sophisticated prompt construction, optimization, and multi-model orchestration
 """
 
-import json
 import asyncio
+import copy
 import logging
 from typing import Dict, List, Optional, Any, Union, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field, replace
+from collections import OrderedDict, deque
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from enum import Enum
 import openai
+import orjson
+import httpx
 from pathlib import Path
+from string import Formatter
 import re
 import hashlib
+import sqlite3
+import statistics
 import time
 
 logger = logging.getLogger(__name__)
@@ -27,6 +37,92 @@ class AIModel(Enum):
     CLAUDE_3_SONNET = "claude-3-sonnet"
     GEMINI_PRO = "gemini-pro"
 
+OPENAI_MODELS = frozenset({AIModel.GPT_4_TURBO, AIModel.GPT_4, AIModel.GPT_3_5_TURBO})
+
+# Models that accept response_format={"type": "json_object"}
+JSON_MODE_MODELS = frozenset({AIModel.GPT_4_TURBO.value, AIModel.GPT_3_5_TURBO.value})
+
+# Output budget per generated file when the caller knows how many to expect
+TOKENS_PER_CODE_FILE = 800
+
+# Times a throttled (429) request is retried on the same model
+MAX_RATE_LIMIT_RETRIES = 3
+
+# Signals that a code generation response actually contains code
+CODE_KEYWORDS = re.compile(r"\b(?:function|class|import|export)\b", re.IGNORECASE)
+
+# Responses larger than this are JSON-decoded in a worker thread; below it the
+# thread hand-off costs more than the parse itself
+OFFLOAD_PARSE_BYTES = 64 * 1024
+
+# How long a cache read or write waits on another worker's SQLite lock before
+# giving up and treating it as a miss
+CACHE_DB_TIMEOUT = 0.1
+
+# Concurrent prompts per generate_code_components batch
+COMPONENT_BATCH_CONCURRENCY = 4
+
+# Hedged requests: the next preferred model is only queried once the current
+# request fails or outlives the p90 latency of its model, so a typical prompt
+# pays for one completion. Until enough latencies are observed the default
+# delay applies
+MAX_HEDGED_REQUESTS = 2
+HEDGE_DEFAULT_DELAY = 10.0
+HEDGE_LATENCY_SAMPLES = 100
+HEDGE_MIN_SAMPLES = 10
+
+# Per-model cap on in-flight requests (keeps bursts under the provider's rate limits)
+MODEL_CONCURRENCY = {
+    AIModel.GPT_4: 4,
+    AIModel.GPT_4_TURBO: 8,
+    AIModel.GPT_3_5_TURBO: 16,
+}
+DEFAULT_MODEL_CONCURRENCY = 8
+
+# Requests allowed to wait for a busy model; beyond this they fail fast so the
+# caller moves on to the next model instead of piling up behind a slow one
+MODEL_QUEUE_LIMIT = 32
+
+# Short analysis prompts without these signals start on the cheap model tier and
+# escalate to the template's preferences when the answer scores below the bar
+SIMPLE_PROMPT_MAX_TOKENS = 30
+MAX_SIMPLE_FEATURES = 3
+COMPLEXITY_SIGNALS = re.compile(
+    r"\b(?:enterprise|multi-?(?:user|tenant|player)|real-?time|payments?|admin|sync|offline)\b",
+    re.IGNORECASE
+)
+FEATURE_SEPARATORS = re.compile(r",|\band\b|\bwith\b", re.IGNORECASE)
+CHEAP_MODEL = AIModel.GPT_3_5_TURBO
+ESCALATION_CONFIDENCE = 0.8
+
+# Batch API polling for offline analysis jobs
+BATCH_POLL_SECONDS = 30.0
+BATCH_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+# Canned analysis served by the local fallback model
+_FALLBACK_ANALYSIS_JSON = orjson.dumps({
+    "name": "Generated App",
+    "description": "A mobile application generated from user prompt",
+    "category": "utility",
+    "framework": "react_native",
+    "features": ["basic_ui", "data_display"],
+    "ui_style": "modern",
+    "target_audience": "general users",
+    "complexity_level": 5,
+    "api_integrations": [],
+    "permissions": ["INTERNET"],
+    "monetization": "free",
+    "similar_apps": [],
+    "unique_selling_points": ["AI-generated", "customizable"],
+    "technical_requirements": ["standard mobile device"]
+}).decode()
+
+# Identical on every call: built once so the request prefix never changes
+SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are an expert mobile app developer and architect. Provide detailed, accurate, and production-ready responses."
+}
+
 class PromptType(Enum):
     """Different types of prompts for specialized tasks"""
     ANALYSIS = "analysis"
@@ -36,20 +132,53 @@ class PromptType(Enum):
     TESTING = "testing"
     DOCUMENTATION = "documentation"
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PromptTemplate:
     """Structured prompt template with variables and constraints"""
     name: str
     type: PromptType
     template: str
-    variables: List[str]
+    variables: Tuple[str, ...]
     constraints: Dict[str, Any]
     model_preferences: List[AIModel]
     max_tokens: int = 2000
     temperature: float = 0.7
     examples: Optional[List[Dict[str, str]]] = None
+    static_prefix: str = field(init=False, repr=False)
+    variable_tail: str = field(init=False, repr=False)
+    compiled_tail: Tuple[Tuple[str, Optional[str]], ...] = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        # Instructions come before any placeholder, so every rendered prompt shares
+        # a byte-identical prefix (provider-side prompt caching) and only the tail
+        # needs formatting
+        split_at = self.template.find("{")
+        if split_at == -1:
+            split_at = len(self.template)
+        variable_tail = self.template[split_at:]
+        
+        # Parse the placeholders once into (literal, variable) segments
+        compiled_tail = []
+        for literal, name, format_spec, conversion in Formatter().parse(variable_tail):
+            if format_spec or conversion:
+                raise ValueError(f"Template {self.name} uses an unsupported placeholder: {{{name}!{conversion}:{format_spec}}}")
+            compiled_tail.append((literal, name))
+        
+        # Frozen dataclass: derived fields are set once, here
+        object.__setattr__(self, "static_prefix", self.template[:split_at])
+        object.__setattr__(self, "variable_tail", variable_tail)
+        object.__setattr__(self, "compiled_tail", tuple(compiled_tail))
+    
+    def render(self, variables: Dict[str, Any]) -> str:
+        """Substitute variables without re-parsing the template"""
+        parts = [self.static_prefix]
+        for literal, name in self.compiled_tail:
+            parts.append(literal)
+            if name is not None:
+                parts.append(str(variables[name]))
+        return "".join(parts)
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AIResponse:
     """Structured AI response with metadata"""
     content: str
@@ -59,175 +188,314 @@ class AIResponse:
     response_time: float
     confidence_score: Optional[float] = None
     metadata: Optional[Dict[str, Any]] = None
+    # JSON-decoded content, parsed once when the response arrives
+    parsed: Optional[Any] = None
+
+VALID_CATEGORIES = frozenset({
+    "productivity", "utility", "entertainment", "business", "education", "social",
+    "health", "finance", "travel", "shopping", "news", "photography", "music",
+    "sports", "weather", "food", "lifestyle"
+})
+VALID_FRAMEWORKS = frozenset({"react_native", "flutter", "kivy", "cordova", "native_android"})
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+# Fixed values spliced into the template text at load time (not prompt variables)
+TEMPLATE_CONSTANTS = {
+    "{valid_categories}": ", ".join(sorted(VALID_CATEGORIES)),
+    "{valid_frameworks}": ", ".join(sorted(VALID_FRAMEWORKS)),
+}
+
+# Template metadata; the (multi-KB) prompt text lives in templates/<name>.tmpl
+TEMPLATE_SPECS: Dict[str, Dict[str, Any]] = {
+    "app_analysis": {
+        "type": PromptType.ANALYSIS,
+        "variables": ("prompt", "preferences"),
+        "constraints": {
+            "max_features": 15,
+            "min_features": 3,
+            "valid_categories": VALID_CATEGORIES,
+            "valid_frameworks": VALID_FRAMEWORKS
+        },
+        "model_preferences": [AIModel.GPT_4_TURBO, AIModel.GPT_4, AIModel.CLAUDE_3_OPUS],
+        "max_tokens": 3000,
+        "temperature": 0.8
+    },
+    "app_architecture": {
+        "type": PromptType.ARCHITECTURE,
+        "variables": ("app_spec", "framework", "complexity"),
+        "constraints": {
+            "min_components": 5,
+            "min_screens": 2,
+            "max_screens": 20
+        },
+        "model_preferences": [AIModel.GPT_4_TURBO, AIModel.CLAUDE_3_OPUS],
+        "max_tokens": 4000,
+        "temperature": 0.6
+    },
+    "code_generation": {
+        "type": PromptType.CODE_GENERATION,
+        "variables": ("framework", "app_spec", "architecture", "component"),
+        "constraints": {
+            "min_files": 1,
+            "max_files": 10
+        },
+        "model_preferences": [AIModel.GPT_4_TURBO, AIModel.GPT_4],
+        "max_tokens": 6000,
+        "temperature": 0.4
+    }
+}
+
+@lru_cache(maxsize=None)
+def load_prompt_template(name: str) -> PromptTemplate:
+    """
+    Read and compile a prompt template on first use (shared by all engineers)
+    """
+    text = (TEMPLATES_DIR / f"{name}.tmpl").read_text(encoding="utf-8")
+    for placeholder, value in TEMPLATE_CONSTANTS.items():
+        text = text.replace(placeholder, value)
+    return PromptTemplate(name=name, template=text, **TEMPLATE_SPECS[name])
+
+class PromptTemplateRegistry(Mapping):
+    """
+    Read-only name -> PromptTemplate mapping that loads templates on access
+    """
+    
+    def __getitem__(self, name: str) -> PromptTemplate:
+        if name not in TEMPLATE_SPECS:
+            raise KeyError(name)
+        return load_prompt_template(name)
+    
+    def __iter__(self):
+        return iter(TEMPLATE_SPECS)
+    
+    def __len__(self) -> int:
+        return len(TEMPLATE_SPECS)
+
+def _try_parse_json(content: str) -> Optional[Any]:
+    try:
+        return orjson.loads(content)
+    except orjson.JSONDecodeError:
+        return None
+
+class TokenBucket:
+    """
+    Async token bucket that refills continuously up to capacity per period
+    """
+    
+    def __init__(self, capacity: int, period: float = 60.0):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self._level = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self, amount: int = 1):
+        # A single request larger than the bucket would otherwise wait forever
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._level >= amount:
+                    self._level -= amount
+                    return
+                await asyncio.sleep((amount - self._level) / self.rate)
+
+class ModelSlots:
+    """
+    Concurrency cap for one model with a bounded number of waiters
+    """
+    
+    def __init__(self, max_concurrent: int, max_waiting: int):
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.max_waiting = max_waiting
+        self.waiting = 0
+    
+    @asynccontextmanager
+    async def slot(self, model: AIModel):
+        if self.semaphore.locked() and self.waiting >= self.max_waiting:
+            raise Exception(f"Model {model.value} is overloaded ({self.waiting} requests waiting)")
+        
+        self.waiting += 1
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        
+        try:
+            yield
+        finally:
+            self.semaphore.release()
+
+class ResponseCache:
+    """
+    Bounded LRU cache of AI responses with a time-to-live
+    
+    With a path, entries are also written to a SQLite database (WAL mode) so
+    other worker processes and later restarts reuse them; the in-memory LRU
+    stays in front of it for hot keys. Database calls run on one dedicated
+    thread so lock waits never block the event loop, and a locked database
+    counts as a miss.
+    """
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0, path: Optional[Union[str, Path]] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, AIResponse]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_thread: Optional[ThreadPoolExecutor] = None
+        if path is not None:
+            self._db = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+            self._db_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="response-cache")
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, expires_at REAL NOT NULL, payload BLOB NOT NULL)"
+            )
+            self._db.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+            # Setup above may wait out other workers starting up; requests may not
+            self._db.execute(f"PRAGMA busy_timeout = {int(CACHE_DB_TIMEOUT * 1000)}")
+    
+    async def get(self, key: str) -> Optional[AIResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return await self._load(key)
+        
+        expires_at, response = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        
+        self._entries.move_to_end(key)
+        return response
+    
+    async def set(self, key: str, response: AIResponse):
+        self._remember(key, response, self.ttl)
+        if self._db is not None:
+            payload = orjson.dumps({
+                "content": response.content,
+                "model": response.model.value,
+                "prompt_hash": response.prompt_hash,
+                "tokens_used": response.tokens_used,
+                "confidence_score": response.confidence_score,
+                "metadata": response.metadata
+            })
+            await self._run_db(
+                "INSERT OR REPLACE INTO responses (key, expires_at, payload) VALUES (?, ?, ?)",
+                (key, time.time() + self.ttl, payload)
+            )
+    
+    def close(self):
+        if self._db is not None:
+            # Let queued writes finish before closing the connection
+            self._db_thread.shutdown(wait=True)
+            self._db.close()
+            self._db = None
+            self._db_thread = None
+    
+    async def _run_db(self, sql: str, params: Tuple[Any, ...]) -> Optional[Tuple[Any, ...]]:
+        """Run one statement on the database thread; None if it is busy"""
+        def run():
+            return self._db.execute(sql, params).fetchone()
+        
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._db_thread, run)
+        except sqlite3.OperationalError as e:
+            logger.debug(f"Response cache database unavailable: {e}")
+            return None
+    
+    def _remember(self, key: str, response: AIResponse, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, response)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    async def _load(self, key: str) -> Optional[AIResponse]:
+        if self._db is None:
+            return None
+        
+        now = time.time()
+        row = await self._run_db(
+            "SELECT expires_at, payload FROM responses WHERE key = ? AND expires_at >= ?", (key, now)
+        )
+        if row is None:
+            return None
+        
+        expires_at, payload = row
+        data = orjson.loads(payload)
+        response = AIResponse(
+            model=AIModel(data.pop("model")),
+            response_time=0.0,
+            parsed=_try_parse_json(data["content"]),
+            **data
+        )
+        # Promote to memory for the rest of its disk lifetime
+        self._remember(key, response, expires_at - now)
+        return response
+    
+    def __len__(self) -> int:
+        return len(self._entries)
 
 class PromptEngineer:
     """
     Advanced prompt engineering system with multi-model orchestration
     """
     
-    def __init__(self, openai_api_key: Optional[str] = None):
+    REQUIRED_SPEC_FIELDS = ("name", "description", "category", "framework", "features")
+    
+    def __init__(
+        self,
+        openai_api_key: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        requests_per_minute: int = 500,
+        tokens_per_minute: int = 150_000,
+        cache_path: Optional[Union[str, Path]] = None
+    ):
         self.openai_client = None
+        self._http = None
+        self._owns_http = False
         if openai_api_key:
-            openai.api_key = openai_api_key
-            self.openai_client = openai
+            # One pooled HTTP/2 client for every call: no per-request TCP/TLS handshake
+            if http_client is None:
+                http_client = httpx.AsyncClient(
+                    http2=True,
+                    timeout=httpx.Timeout(60.0, connect=10.0),
+                    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+                )
+                self._owns_http = True
+            self._http = http_client
+            self.openai_client = openai.AsyncOpenAI(api_key=openai_api_key, http_client=http_client)
         
-        self.templates_cache = {}
-        self.response_cache = {}
+        # A cache_path shares responses across worker processes and restarts
+        self.response_cache = ResponseCache(path=cache_path)
+        self._model_slots = {
+            model: ModelSlots(MODEL_CONCURRENCY.get(model, DEFAULT_MODEL_CONCURRENCY), MODEL_QUEUE_LIMIT)
+            for model in AIModel
+        }
+        # Recent successful response times per model, for the hedge delay
+        self._latencies = {model: deque(maxlen=HEDGE_LATENCY_SAMPLES) for model in AIModel}
+        # Client-side throttling keeps bursts under the account's RPM/TPM limits
+        self._rpm = TokenBucket(requests_per_minute)
+        self._tpm = TokenBucket(tokens_per_minute)
         self.load_prompt_templates()
     
+    async def aclose(self):
+        """Close the pooled HTTP client if this instance created it, and the cache database"""
+        self.response_cache.close()
+        if self._owns_http and self._http is not None:
+            await self._http.aclose()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+    
     def load_prompt_templates(self):
-        """Load and cache prompt templates"""
-        templates_dir = Path(__file__).parent / "templates"
-        templates_dir.mkdir(exist_ok=True)
-        
-        # Analysis Templates
-        self.templates_cache["app_analysis"] = PromptTemplate(
-            name="app_analysis",
-            type=PromptType.ANALYSIS,
-            template="""
-You are an expert mobile app analyst. Analyze the following app description and extract structured information.
-
-User Request: "{prompt}"
-User Preferences: {preferences}
-
-Extract and return a JSON object with these fields:
-- name: App name (generate creative name if not specified)
-- description: Detailed app description (expand on user input)
-- category: One of [productivity, utility, entertainment, business, education, social, health, finance, travel, shopping, news, photography, music, sports, weather, food, lifestyle]
-- framework: Recommended framework based on requirements [react_native, flutter, kivy, cordova, native_android]
-- features: List of main features (be comprehensive)
-- ui_style: UI/UX style description (modern, minimalist, colorful, professional, etc.)
-- target_audience: Target user demographic
-- complexity_level: Complexity on 1-10 scale
-- api_integrations: Required external APIs
-- permissions: Required Android permissions
-- monetization: Suggested monetization strategy
-- similar_apps: List of similar existing apps for reference
-- unique_selling_points: What makes this app special
-- technical_requirements: Special technical considerations
-
-Consider these factors:
-1. App complexity and required features
-2. Target audience and use case
-3. Performance requirements
-4. Development timeline
-5. Maintenance considerations
-
-Respond with valid JSON only. Be thorough and creative while staying practical.
-            """,
-            variables=["prompt", "preferences"],
-            constraints={
-                "max_features": 15,
-                "min_features": 3,
-                "valid_categories": ["productivity", "utility", "entertainment", "business", "education", "social", "health", "finance", "travel", "shopping", "news", "photography", "music", "sports", "weather", "food", "lifestyle"],
-                "valid_frameworks": ["react_native", "flutter", "kivy", "cordova", "native_android"]
-            },
-            model_preferences=[AIModel.GPT_4_TURBO, AIModel.GPT_4, AIModel.CLAUDE_3_OPUS],
-            max_tokens=3000,
-            temperature=0.8
-        )
-        
-        # Architecture Templates
-        self.templates_cache["app_architecture"] = PromptTemplate(
-            name="app_architecture",
-            type=PromptType.ARCHITECTURE,
-            template="""
-You are a senior software architect specializing in mobile applications. Design a comprehensive architecture for the following app:
-
-App Specification:
-{app_spec}
-
-Framework: {framework}
-Complexity Level: {complexity}/10
-
-Design a detailed application architecture and return a JSON object with:
-
-- components: List of UI components with descriptions
-- screens: List of app screens/pages with navigation flow
-- navigation: Navigation structure and routing
-- data_flow: Data management approach (state management, local storage, etc.)
-- external_services: Required external integrations and APIs
-- file_structure: Recommended project file/folder structure
-- dependencies: Required packages and libraries
-- database_schema: If data persistence is needed
-- api_endpoints: If backend services are required
-- security_considerations: Security measures and best practices
-- performance_optimizations: Performance enhancement strategies
-- testing_strategy: Recommended testing approach
-- deployment_considerations: Build and deployment requirements
-
-Consider these architectural principles:
-1. Scalability and maintainability
-2. Performance optimization
-3. Security best practices
-4. User experience optimization
-5. Code reusability
-6. Framework-specific best practices
-
-Provide detailed, production-ready architecture. Return valid JSON only.
-            """,
-            variables=["app_spec", "framework", "complexity"],
-            constraints={
-                "min_components": 5,
-                "min_screens": 2,
-                "max_screens": 20
-            },
-            model_preferences=[AIModel.GPT_4_TURBO, AIModel.CLAUDE_3_OPUS],
-            max_tokens=4000,
-            temperature=0.6
-        )
-        
-        # Code Generation Templates
-        self.templates_cache["code_generation"] = PromptTemplate(
-            name="code_generation",
-            type=PromptType.CODE_GENERATION,
-            template="""
-You are an expert {framework} developer. Generate production-ready code for the following specification:
-
-App Specification:
-{app_spec}
-
-Architecture:
-{architecture}
-
-Component to Generate: {component}
-
-Generate complete, production-ready code with:
-1. Proper error handling
-2. Type safety (where applicable)
-3. Performance optimizations
-4. Accessibility features
-5. Responsive design
-6. Clean, maintainable code structure
-7. Comprehensive comments
-8. Best practices for {framework}
-
-Include:
-- Main component/screen code
-- Styling/CSS (if applicable)
-- State management
-- API integration (if needed)
-- Navigation setup
-- Testing utilities
-
-Return a JSON object with:
-- files: Dictionary of filename -> file content
-- dependencies: List of required packages
-- setup_instructions: Step-by-step setup guide
-- testing_notes: How to test the component
-- optimization_notes: Performance considerations
-
-Focus on code quality, maintainability, and following {framework} best practices.
-            """,
-            variables=["framework", "app_spec", "architecture", "component"],
-            constraints={
-                "min_files": 1,
-                "max_files": 10
-            },
-            model_preferences=[AIModel.GPT_4_TURBO, AIModel.GPT_4],
-            max_tokens=6000,
-            temperature=0.4
-        )
+        """Expose the shared, lazily loaded prompt templates"""
+        self.templates_cache = PromptTemplateRegistry()
     
     async def analyze_app_prompt(self, prompt: str, user_preferences: Optional[Dict] = None) -> Dict[str, Any]:
         """
@@ -238,7 +506,7 @@ Focus on code quality, maintainability, and following {framework} best practices
         # Prepare variables
         variables = {
             "prompt": prompt,
-            "preferences": json.dumps(user_preferences or {}, indent=2)
+            "preferences": orjson.dumps(user_preferences or {}).decode()
         }
         
         # Generate and execute prompt
@@ -246,7 +514,7 @@ Focus on code quality, maintainability, and following {framework} best practices
         
         try:
             # Parse JSON response
-            app_spec = json.loads(response.content)
+            app_spec = self._response_json(response)
             
             # Validate and enhance response
             app_spec = self._validate_app_specification(app_spec)
@@ -254,6 +522,8 @@ Focus on code quality, maintainability, and following {framework} best practices
             return {
                 "success": True,
                 "app_specification": app_spec,
+                # Serialized once here and passed on to the later stages' prompts
+                "app_specification_json": orjson.dumps(app_spec).decode(),
                 "ai_metadata": {
                     "model": response.model.value,
                     "confidence": response.confidence_score,
@@ -261,7 +531,7 @@ Focus on code quality, maintainability, and following {framework} best practices
                 }
             }
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse AI response as JSON: {e}")
             return {
                 "success": False,
@@ -269,14 +539,112 @@ Focus on code quality, maintainability, and following {framework} best practices
                 "raw_response": response.content
             }
     
-    async def generate_architecture(self, app_spec: Dict[str, Any]) -> Dict[str, Any]:
+    async def analyze_app_prompts_batch(
+        self,
+        prompts: List[str],
+        output_jsonl: Union[str, Path],
+        user_preferences: Optional[Dict] = None,
+        poll_interval: float = BATCH_POLL_SECONDS
+    ) -> Dict[str, int]:
+        """
+        Analyze many prompts through the OpenAI Batch API (non-interactive, half price)
+        
+        Results are appended to output_jsonl one line per prompt index, and the
+        running batch id is kept next to it, so a rerun after a crash resumes the
+        same batch and only resubmits prompts without a result.
+        """
+        if not self.openai_client:
+            raise Exception("OpenAI client not initialized")
+        
+        output_jsonl = Path(output_jsonl)
+        checkpoint = output_jsonl.with_name(output_jsonl.name + ".batch")
+        
+        done = set()
+        if output_jsonl.exists():
+            with output_jsonl.open("rb") as f:
+                done = {orjson.loads(line)["custom_id"] for line in f if line.strip()}
+        
+        pending = [(str(index), prompt) for index, prompt in enumerate(prompts) if str(index) not in done]
+        if not pending:
+            return {"completed": 0, "failed": 0}
+        
+        if checkpoint.exists():
+            batch = await self.openai_client.batches.retrieve(checkpoint.read_text().strip())
+        else:
+            template = self.templates_cache["app_analysis"]
+            model = next(model for model in template.model_preferences if model in OPENAI_MODELS).value
+            preferences = orjson.dumps(user_preferences or {}).decode()
+            
+            lines = []
+            for custom_id, prompt in pending:
+                body = {
+                    "model": model,
+                    "messages": [SYSTEM_MESSAGE, {"role": "user", "content": template.render({"prompt": prompt, "preferences": preferences})}],
+                    "max_tokens": template.max_tokens,
+                    "temperature": template.temperature
+                }
+                if model in JSON_MODE_MODELS:
+                    body["response_format"] = {"type": "json_object"}
+                lines.append(orjson.dumps({"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": body}))
+            
+            batch_file = await self.openai_client.files.create(
+                file=("app_analysis_batch.jsonl", b"\n".join(lines)),
+                purpose="batch"
+            )
+            batch = await self.openai_client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+            checkpoint.write_text(batch.id)
+        
+        while batch.status not in BATCH_TERMINAL_STATUSES:
+            await asyncio.sleep(poll_interval)
+            batch = await self.openai_client.batches.retrieve(batch.id)
+        
+        prompts_by_id = dict(pending)
+        completed = 0
+        if batch.output_file_id:
+            results = await self.openai_client.files.content(batch.output_file_id)
+            with output_jsonl.open("ab") as out:
+                for line in results.text.splitlines():
+                    if not line.strip():
+                        continue
+                    result = orjson.loads(line)
+                    custom_id = result["custom_id"]
+                    if custom_id not in prompts_by_id:
+                        continue
+                    
+                    try:
+                        content = result["response"]["body"]["choices"][0]["message"]["content"]
+                        app_spec = self._validate_app_specification(orjson.loads(content))
+                    except (KeyError, IndexError, TypeError, orjson.JSONDecodeError) as e:
+                        logger.warning(f"Batch item {custom_id} failed: {e}")
+                        continue
+                    
+                    out.write(orjson.dumps({
+                        "custom_id": custom_id,
+                        "prompt": prompts_by_id[custom_id],
+                        "app_specification": app_spec
+                    }) + b"\n")
+                    completed += 1
+        
+        # Failed items have no output line, so the next run resubmits just those
+        checkpoint.unlink(missing_ok=True)
+        failed = len(pending) - completed
+        logger.info(f"Batch {batch.id} {batch.status}: {completed} completed, {failed} failed")
+        return {"completed": completed, "failed": failed}
+    
+    async def generate_architecture(self, app_spec: Dict[str, Any], app_spec_json: Optional[str] = None) -> Dict[str, Any]:
         """
         Generate comprehensive application architecture
+        
+        app_spec_json is the serialized spec from analyze_app_prompt, when available.
         """
         template = self.templates_cache["app_architecture"]
         
         variables = {
-            "app_spec": json.dumps(app_spec, indent=2),
+            "app_spec": app_spec_json or orjson.dumps(app_spec).decode(),
             "framework": app_spec.get("framework", "react_native"),
             "complexity": app_spec.get("complexity_level", 5)
         }
@@ -284,7 +652,7 @@ Focus on code quality, maintainability, and following {framework} best practices
         response = await self._execute_prompt(template, variables)
         
         try:
-            architecture = json.loads(response.content)
+            architecture = self._response_json(response)
             
             # Enhance architecture with framework-specific details
             architecture = self._enhance_architecture(architecture, app_spec)
@@ -292,13 +660,14 @@ Focus on code quality, maintainability, and following {framework} best practices
             return {
                 "success": True,
                 "architecture": architecture,
+                "architecture_json": orjson.dumps(architecture).decode(),
                 "ai_metadata": {
                     "model": response.model.value,
                     "response_time": response.response_time
                 }
             }
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse architecture response: {e}")
             return {
                 "success": False,
@@ -306,23 +675,76 @@ Focus on code quality, maintainability, and following {framework} best practices
                 "raw_response": response.content
             }
     
-    async def generate_code_component(self, app_spec: Dict[str, Any], architecture: Dict[str, Any], component: str) -> Dict[str, Any]:
+    async def generate_code_component(
+        self,
+        app_spec: Dict[str, Any],
+        architecture: Dict[str, Any],
+        component: str,
+        expected_files: Optional[int] = None,
+        app_spec_json: Optional[str] = None,
+        architecture_json: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
-        Generate code for a specific component
+        Generate code for a specific component (expected_files sizes the output budget)
         """
-        template = self.templates_cache["code_generation"]
+        context = self._code_context(app_spec, architecture, app_spec_json, architecture_json)
+        return await self._generate_code(context, component, expected_files)
+    
+    async def generate_code_components(
+        self,
+        app_spec: Dict[str, Any],
+        architecture: Dict[str, Any],
+        components: List[str],
+        app_spec_json: Optional[str] = None,
+        architecture_json: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate several independent components concurrently
         
-        variables = {
+        The app spec and architecture are serialized once, and every prompt differs
+        only in its trailing component name, so the shared prefix is cacheable.
+        """
+        context = self._code_context(app_spec, architecture, app_spec_json, architecture_json)
+        semaphore = asyncio.Semaphore(COMPONENT_BATCH_CONCURRENCY)
+        
+        async def generate(component: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._generate_code(context, component)
+        
+        results = await asyncio.gather(*(generate(component) for component in components), return_exceptions=True)
+        
+        return [
+            {"success": False, "error": str(result)} if isinstance(result, Exception) else result
+            for result in results
+        ]
+    
+    @staticmethod
+    def _code_context(
+        app_spec: Dict[str, Any],
+        architecture: Dict[str, Any],
+        app_spec_json: Optional[str] = None,
+        architecture_json: Optional[str] = None
+    ) -> Dict[str, Any]:
+        # Reuse the JSON produced by earlier stages so prompts stay byte-identical
+        return {
             "framework": app_spec.get("framework", "react_native"),
-            "app_spec": json.dumps(app_spec, indent=2),
-            "architecture": json.dumps(architecture, indent=2),
-            "component": component
+            "app_spec": app_spec_json or orjson.dumps(app_spec).decode(),
+            "architecture": architecture_json or orjson.dumps(architecture).decode()
         }
+    
+    async def _generate_code(self, context: Dict[str, Any], component: str, expected_files: Optional[int] = None) -> Dict[str, Any]:
+        template = self.templates_cache["code_generation"]
+        variables = {**context, "component": component}
         
-        response = await self._execute_prompt(template, variables)
+        # Small components finish sooner with a proportionally smaller token budget
+        max_tokens = None
+        if expected_files:
+            max_tokens = min(template.max_tokens, expected_files * TOKENS_PER_CODE_FILE)
+        
+        response = await self._execute_prompt(template, variables, max_tokens=max_tokens)
         
         try:
-            code_result = json.loads(response.content)
+            code_result = self._response_json(response)
             
             return {
                 "success": True,
@@ -333,7 +755,7 @@ Focus on code quality, maintainability, and following {framework} best practices
                 }
             }
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse code generation response: {e}")
             return {
                 "success": False,
@@ -341,74 +763,215 @@ Focus on code quality, maintainability, and following {framework} best practices
                 "raw_response": response.content
             }
     
-    async def _execute_prompt(self, template: PromptTemplate, variables: Dict[str, Any]) -> AIResponse:
+    @staticmethod
+    def _response_json(response: AIResponse) -> Any:
+        """Decoded response content, reusing the parse done when it arrived"""
+        parsed = getattr(response, "parsed", None)
+        if isinstance(parsed, (dict, list)):
+            # The parse is shared by every cache hit; callers edit what they get
+            return copy.deepcopy(parsed)
+        return orjson.loads(response.content)
+    
+    async def _execute_prompt(self, template: PromptTemplate, variables: Dict[str, Any], max_tokens: Optional[int] = None) -> AIResponse:
         """
         Execute a prompt with the best available AI model
         """
         # Format prompt with variables
-        formatted_prompt = template.template.format(**variables)
+        formatted_prompt = template.render(variables)
         
         # Generate prompt hash for caching
-        prompt_hash = hashlib.md5(formatted_prompt.encode()).hexdigest()
+        prompt_hash = hashlib.blake2b(formatted_prompt.encode(), digest_size=16).hexdigest()
         
         # Check cache
-        if prompt_hash in self.response_cache:
-            return self.response_cache[prompt_hash]
+        cached = await self.response_cache.get(prompt_hash)
+        if cached is not None:
+            return replace(cached, response_time=0.0)
+        
+        models = self._pick_model(template, variables)
+        ai_response = None
         
-        # Try models in order of preference
-        for model in template.model_preferences:
+        if models[0] not in template.model_preferences:
+            # Routed to the cheap tier: try it alone, escalate on failure or a weak answer
+            cheap_model = models.pop(0)
             try:
-                start_time = time.time()
-                
-                if model in [AIModel.GPT_4_TURBO, AIModel.GPT_4, AIModel.GPT_3_5_TURBO]:
-                    response = await self._call_openai(
-                        model=model.value,
-                        prompt=formatted_prompt,
-                        max_tokens=template.max_tokens,
-                        temperature=template.temperature
-                    )
-                else:
-                    # Fallback for other models
-                    response = await self._call_fallback_model(formatted_prompt, template)
-                
-                response_time = time.time() - start_time
-                
-                ai_response = AIResponse(
-                    content=response["content"],
-                    model=model,
-                    prompt_hash=prompt_hash,
-                    tokens_used=response.get("tokens_used", 0),
-                    response_time=response_time,
-                    confidence_score=self._calculate_confidence(response["content"], template)
-                )
-                
-                # Cache successful response
-                self.response_cache[prompt_hash] = ai_response
-                
-                return ai_response
-                
+                ai_response = await self._call_model(cheap_model, formatted_prompt, prompt_hash, template, max_tokens)
+            except Exception as e:
+                logger.warning(f"Model {cheap_model.value} failed: {e}")
+            if ai_response is not None and ai_response.confidence_score < ESCALATION_CONFIDENCE:
+                logger.info(f"Escalating low-confidence {cheap_model.value} response")
+                ai_response = None
+        
+        # Hedge the top remote models so a slow or throttled one doesn't serialize
+        # the fallback; local fallbacks answer instantly, so only try them last
+        remote_models = [model for model in models if model in OPENAI_MODELS]
+        local_models = [model for model in models if model not in OPENAI_MODELS]
+        
+        if ai_response is None:
+            ai_response = await self._race_models(remote_models, formatted_prompt, prompt_hash, template, max_tokens)
+        
+        for model in local_models:
+            if ai_response is not None and self._is_usable(ai_response, template):
+                break
+            try:
+                response = await self._call_model(model, formatted_prompt, prompt_hash, template, max_tokens)
             except Exception as e:
                 logger.warning(f"Model {model.value} failed: {e}")
                 continue
+            if ai_response is None or self._is_usable(response, template):
+                ai_response = response
+        
+        if ai_response is None:
+            # If all models fail, raise exception
+            raise Exception("All AI models failed to respond")
+        
+        # Cache successful response; an unparseable one is worth retrying
+        if self._is_usable(ai_response, template):
+            await self.response_cache.set(prompt_hash, ai_response)
+        
+        return ai_response
+    
+    def _pick_model(self, template: PromptTemplate, variables: Dict[str, Any]) -> List[AIModel]:
+        """
+        Order the models to try, leading with the cheap tier for simple analysis prompts
+        """
+        models = list(template.model_preferences)
+        if template.type != PromptType.ANALYSIS:
+            return models
+        
+        prompt = variables.get("prompt", "")
+        if (
+            len(prompt) // 4 < SIMPLE_PROMPT_MAX_TOKENS
+            and not COMPLEXITY_SIGNALS.search(prompt)
+            and len(FEATURE_SEPARATORS.findall(prompt)) < MAX_SIMPLE_FEATURES
+        ):
+            return [CHEAP_MODEL] + [model for model in models if model != CHEAP_MODEL]
+        return models
+    
+    async def _race_models(self, models: List[AIModel], prompt: str, prompt_hash: str, template: PromptTemplate, max_tokens: Optional[int] = None) -> Optional[AIResponse]:
+        """
+        Query models in preference order, hedging a slow request with the next one
+        
+        The next model starts when every request in flight has failed, or when
+        the newest one outlives its model's hedge delay (at most
+        MAX_HEDGED_REQUESTS in flight). A reply that doesn't parse for a JSON
+        template only wins if no model produces one that does.
+        """
+        queue = list(models)
+        running: Dict[asyncio.Task, AIModel] = {}
+        unusable: Optional[AIResponse] = None
+        loop = asyncio.get_running_loop()
+        hedge_at = 0.0
+        
+        def launch():
+            nonlocal hedge_at
+            model = queue.pop(0)
+            running[asyncio.create_task(self._call_model(model, prompt, prompt_hash, template, max_tokens))] = model
+            hedge_at = loop.time() + self._hedge_delay(model)
+        
+        if queue:
+            launch()
+        try:
+            while running:
+                timeout = None
+                if queue and len(running) < MAX_HEDGED_REQUESTS:
+                    timeout = max(0.0, hedge_at - loop.time())
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                # On a tie prefer the model ranked higher in the template
+                for task in sorted(done, key=lambda task: models.index(running[task])):
+                    model = running.pop(task)
+                    if task.exception() is not None:
+                        logger.warning(f"Model {model.value} failed: {task.exception()}")
+                    elif self._is_usable(task.result(), template):
+                        return task.result()
+                    else:
+                        logger.warning(f"Model {model.value} returned an unparseable response")
+                        unusable = unusable or task.result()
+                if queue and (not done or not running):
+                    if not done:
+                        logger.info(f"Hedging slow request with {queue[0].value}")
+                    launch()
+            return unusable
+        finally:
+            for task in running:
+                task.cancel()
+    
+    def _hedge_delay(self, model: AIModel) -> float:
+        """Seconds to wait on a model before hedging: its p90 latency once known"""
+        samples = self._latencies[model]
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        return statistics.quantiles(samples, n=10)[-1]
+    
+    @staticmethod
+    def _is_usable(response: AIResponse, template: PromptTemplate) -> bool:
+        """Whether a response can be used: JSON templates need content that parsed"""
+        if template.type in (PromptType.ANALYSIS, PromptType.ARCHITECTURE):
+            return response.parsed is not None
+        return True
+    
+    async def _call_model(self, model: AIModel, prompt: str, prompt_hash: str, template: PromptTemplate, max_tokens: Optional[int] = None) -> AIResponse:
+        """
+        Run a prompt on a single model, respecting its concurrency limit
+        """
+        async with self._model_slots[model].slot(model):
+            start_time = time.time()
+            
+            if model in OPENAI_MODELS:
+                response = await self._call_openai(
+                    model=model.value,
+                    prompt=prompt,
+                    max_tokens=max_tokens or template.max_tokens,
+                    temperature=template.temperature
+                )
+            else:
+                # Fallback for other models
+                response = await self._call_fallback_model(prompt, template)
+            
+            response_time = time.time() - start_time
         
-        # If all models fail, raise exception
-        raise Exception("All AI models failed to respond")
+        self._latencies[model].append(response_time)
+        content = response["content"]
+        if len(content) > OFFLOAD_PARSE_BYTES:
+            # Large code payloads: decode off the event loop thread
+            parsed = await asyncio.to_thread(_try_parse_json, content)
+        else:
+            parsed = _try_parse_json(content)
+        
+        return AIResponse(
+            content=content,
+            model=model,
+            prompt_hash=prompt_hash,
+            tokens_used=response.get("tokens_used", 0),
+            response_time=response_time,
+            # Code responses are scored on their raw text
+            confidence_score=self._calculate_confidence(
+                content if parsed is None or template.type == PromptType.CODE_GENERATION else parsed,
+                template
+            ),
+            parsed=parsed
+        )
     
-    async def _call_openai(self, model: str, prompt: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+    async def _call_openai(self, model: str, prompt: str, max_tokens: int, temperature: float, expect_json: bool = True) -> Dict[str, Any]:
         """
         Call OpenAI API with error handling
         """
         if not self.openai_client:
             raise Exception("OpenAI client not initialized")
         
+        # JSON mode guarantees a parseable object where the model supports it
+        extra_args = {}
+        if expect_json and model in JSON_MODE_MODELS:
+            extra_args["response_format"] = {"type": "json_object"}
+        
         try:
-            response = await self.openai_client.ChatCompletion.acreate(
+            # Stream the completion so malformed output is rejected on the first
+            # tokens instead of after the full (multi-second) generation
+            stream = await self._create_completion(
+                # ~4 characters per token for the input, plus the full output budget
+                len(prompt) // 4 + max_tokens,
                 model=model,
                 messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert mobile app developer and architect. Provide detailed, accurate, and production-ready responses."
-                    },
+                    SYSTEM_MESSAGE,
                     {
                         "role": "user",
                         "content": prompt
@@ -418,18 +981,66 @@ Focus on code quality, maintainability, and following {framework} best practices
                 temperature=temperature,
                 top_p=0.9,
                 frequency_penalty=0.1,
-                presence_penalty=0.1
+                presence_penalty=0.1,
+                stream=True,
+                stream_options={"include_usage": True},
+                **extra_args
             )
             
+            chunks = []
+            started = False
+            tokens_used = 0
+            async for chunk in stream:
+                # The final chunk carries usage and no choices
+                if chunk.usage is not None:
+                    tokens_used = chunk.usage.total_tokens
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                
+                if expect_json and not started:
+                    head = delta.lstrip()
+                    if head:
+                        started = True
+                        # JSON (optionally inside a ``` fence) must open immediately
+                        if head[0] not in "{`":
+                            raise ValueError(f"Model {model} did not start a JSON response")
+                
+                chunks.append(delta)
+            
             return {
-                "content": response.choices[0].message.content,
-                "tokens_used": response.usage.total_tokens
+                "content": "".join(chunks),
+                "tokens_used": tokens_used
             }
             
         except Exception as e:
             logger.error(f"OpenAI API call failed: {e}")
             raise
     
+    async def _create_completion(self, estimated_tokens: int, **request) -> Any:
+        """
+        Start a chat completion within the RPM/TPM budget, waiting out throttling
+        
+        A 429 means "slow down", not "this model is broken": retry the same model
+        after Retry-After instead of falling through to a weaker one.
+        """
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            await self._rpm.acquire(1)
+            await self._tpm.acquire(estimated_tokens)
+            try:
+                return await self.openai_client.chat.completions.create(**request)
+            except openai.RateLimitError as e:
+                if attempt == MAX_RATE_LIMIT_RETRIES:
+                    raise
+                try:
+                    retry_after = float(e.response.headers.get("retry-after", ""))
+                except ValueError:
+                    retry_after = 2.0 ** attempt
+                logger.warning(f"Rate limited on {request['model']}, retrying in {retry_after:.1f}s")
+                await asyncio.sleep(retry_after)
+    
     async def _call_fallback_model(self, prompt: str, template: PromptTemplate) -> Dict[str, Any]:
         """
         Fallback model implementation (local or alternative API)
@@ -438,25 +1049,7 @@ Focus on code quality, maintainability, and following {framework} best practices
         # For now, return a structured fallback response
         
         if template.type == PromptType.ANALYSIS:
-            return {
-                "content": json.dumps({
-                    "name": "Generated App",
-                    "description": "A mobile application generated from user prompt",
-                    "category": "utility",
-                    "framework": "react_native",
-                    "features": ["basic_ui", "data_display"],
-                    "ui_style": "modern",
-                    "target_audience": "general users",
-                    "complexity_level": 5,
-                    "api_integrations": [],
-                    "permissions": ["INTERNET"],
-                    "monetization": "free",
-                    "similar_apps": [],
-                    "unique_selling_points": ["AI-generated", "customizable"],
-                    "technical_requirements": ["standard mobile device"]
-                }),
-                "tokens_used": 500
-            }
+            return {"content": _FALLBACK_ANALYSIS_JSON, "tokens_used": 500}
         
         # Add more fallback responses for other prompt types
         return {
@@ -464,14 +1057,15 @@ Focus on code quality, maintainability, and following {framework} best practices
             "tokens_used": 100
         }
     
-    def _calculate_confidence(self, response: str, template: PromptTemplate) -> float:
+    def _calculate_confidence(self, response: Union[str, Dict[str, Any], List[Any]], template: PromptTemplate) -> float:
         """
-        Calculate confidence score for AI response
+        Calculate confidence score for AI response (raw text or already-parsed JSON)
         """
         try:
             # For JSON responses, check if valid JSON
             if template.type in [PromptType.ANALYSIS, PromptType.ARCHITECTURE]:
-                json.loads(response)
+                if isinstance(response, str):
+                    orjson.loads(response)
                 confidence = 0.8  # Base confidence for valid JSON
                 
                 # Check for required fields based on template constraints
@@ -483,7 +1077,7 @@ Focus on code quality, maintainability, and following {framework} best practices
             
             # For code generation, check for basic code structure
             elif template.type == PromptType.CODE_GENERATION:
-                if any(keyword in response.lower() for keyword in ["function", "class", "import", "export"]):
+                if CODE_KEYWORDS.search(response):
                     return 0.7
                 return 0.5
             
@@ -497,19 +1091,16 @@ Focus on code quality, maintainability, and following {framework} best practices
         Validate and enhance app specification
         """
         # Ensure required fields exist
-        required_fields = ["name", "description", "category", "framework", "features"]
-        for field in required_fields:
+        for field in self.REQUIRED_SPEC_FIELDS:
             if field not in app_spec:
                 app_spec[field] = self._get_default_value(field)
         
         # Validate category
-        valid_categories = ["productivity", "utility", "entertainment", "business", "education", "social", "health", "finance", "travel", "shopping", "news", "photography", "music", "sports", "weather", "food", "lifestyle"]
-        if app_spec["category"] not in valid_categories:
+        if app_spec["category"] not in VALID_CATEGORIES:
             app_spec["category"] = "utility"
         
         # Validate framework
-        valid_frameworks = ["react_native", "flutter", "kivy", "cordova", "native_android"]
-        if app_spec["framework"] not in valid_frameworks:
+        if app_spec["framework"] not in VALID_FRAMEWORKS:
             app_spec["framework"] = "react_native"
         
         # Ensure complexity level is within range
@@ -622,14 +1213,14 @@ if __name__ == "__main__":
         
         if result["success"]:
             print("✅ App Analysis Success:")
-            print(json.dumps(result["app_specification"], indent=2))
+            print(orjson.dumps(result["app_specification"], option=orjson.OPT_INDENT_2).decode())
             
             # Test architecture generation
-            arch_result = await engineer.generate_architecture(result["app_specification"])
+            arch_result = await engineer.generate_architecture(result["app_specification"], result["app_specification_json"])
             
             if arch_result["success"]:
                 print("\n✅ Architecture Generation Success:")
-                print(json.dumps(arch_result["architecture"], indent=2))
+                print(orjson.dumps(arch_result["architecture"], option=orjson.OPT_INDENT_2).decode())
         else:
             print(f"❌ Analysis Failed: {result['error']}")
     
@@ -14,19 +14,71 @@ import os
 import json
 import asyncio
 import logging
-from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass, asdict
+import hashlib
+import re
+import time
+from typing import Dict, List, Optional, Tuple, Any, Callable, Awaitable, Union
+from dataclasses import dataclass, asdict, replace
 from enum import Enum
 import openai
+import httpx
 from pathlib import Path
+from string import Template
 import subprocess
 import tempfile
 import shutil
+from concurrent.futures import Executor
+from contextlib import asynccontextmanager
+
+from core.ai_engine.prompt_engineer import AIModel, AIResponse, ResponseCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Model behind the engine's analysis and architecture calls
+ENGINE_MODEL = AIModel.GPT_4
+DEFAULT_LLM_CONCURRENCY = 8
+
+# Prompts shaped like "Create a <subject> app ..."; with the templated fast path
+# enabled these are analyzed locally instead of by the LLM
+_TEMPLATED_PROMPT_RE = re.compile(
+    r"^\s*(?:create|build|make|generate)\s+(?:an?\s+)?(?P<subject>[a-z0-9][a-z0-9 '-]*?)\s+app\b",
+    re.IGNORECASE
+)
+
+# Fixed instructions sent as the system message ahead of the per-request details;
+# keeping them byte-identical lets the provider reuse its cached prompt prefix
+ANALYSIS_INSTRUCTIONS = """Analyze the app description in the user message and extract structured information.
+
+Extract and return a JSON object with these fields:
+- name: App name (generate if not specified)
+- description: Detailed app description
+- category: One of [productivity, utility, entertainment, business, education, social, health, finance]
+- framework: Recommended framework [react_native, flutter, kivy, cordova, native_android]
+- features: List of main features
+- ui_style: UI/UX style description
+- target_audience: Target user demographic
+- complexity_level: Complexity on 1-10 scale
+- api_integrations: Required external APIs
+- permissions: Required Android permissions
+
+Take the user preferences in the user message into account.
+
+Respond with valid JSON only."""
+
+ARCHITECTURE_INSTRUCTIONS = """Generate a detailed application architecture for the app described in the user message.
+
+Return JSON with:
+- components: List of UI components needed
+- screens: List of app screens/pages
+- navigation: Navigation structure
+- data_flow: Data management approach
+- external_services: Required external integrations
+- file_structure: Recommended project file structure
+
+Respond with valid JSON only."""
+
 class AppFramework(Enum):
     """Supported application development frameworks"""
     REACT_NATIVE = "react_native"
@@ -61,38 +113,187 @@ class AppSpecification:
     permissions: List[str]
     monetization: Optional[str] = None
     
+# Keywords for the fallback analysis; checked in order (first category wins) and
+# matched as substrings, one precompiled alternation per group
+CATEGORY_KEYWORDS = {
+    AppCategory.PRODUCTIVITY: ["todo", "task", "note", "calendar", "reminder"],
+    AppCategory.UTILITY: ["calculator", "converter", "tool", "scanner"],
+    AppCategory.ENTERTAINMENT: ["game", "music", "video", "photo"],
+    AppCategory.BUSINESS: ["inventory", "sales", "crm", "analytics"],
+    AppCategory.EDUCATION: ["quiz", "learn", "study", "dictionary"]
+}
+
+FEATURE_KEYWORDS = {
+    "authentication": ["login", "signup", "auth", "account"],
+    "data_storage": ["save", "store", "database", "persist"],
+    "networking": ["api", "sync", "cloud", "server"],
+    "camera": ["photo", "camera", "picture", "scan"],
+    "location": ["gps", "location", "map", "navigation"],
+    "notifications": ["notify", "alert", "reminder", "push"]
+}
+
+def _keyword_pattern(keywords: List[str]) -> "re.Pattern[str]":
+    return re.compile("|".join(map(re.escape, keywords)))
+
+_CATEGORY_PATTERNS = {category: _keyword_pattern(keywords) for category, keywords in CATEGORY_KEYWORDS.items()}
+_FEATURE_PATTERNS = {feature: _keyword_pattern(keywords) for feature, keywords in FEATURE_KEYWORDS.items()}
+
+_JSON_DECODER = json.JSONDecoder()
+
+def _first_json_object(text: str) -> Optional[str]:
+    """The first complete JSON object in text, or None"""
+    start = text.find("{")
+    if start == -1:
+        return None
+    try:
+        _, end = _JSON_DECODER.raw_decode(text, start)
+    except ValueError:
+        return None
+    return text[start:end]
+
+async def _read_json_stream(stream, prompt_tokens: int) -> Tuple[str, int, bool]:
+    """
+    Join a streamed completion, stopping as soon as it holds one complete JSON object
+    
+    Returns the content (just the object when one was found), the tokens used and
+    whether a complete object was found. Usage is only reported at the end of the
+    stream, so a stream closed early is counted as the prompt estimate plus one
+    token per streamed chunk.
+    """
+    chunks = []
+    depth = 0
+    tokens_used = None
+    async for chunk in stream:
+        # The final chunk carries usage and no choices
+        if chunk.usage is not None:
+            tokens_used = chunk.usage.total_tokens
+        if not chunk.choices or not chunk.choices[0].delta.content:
+            continue
+        delta = chunk.choices[0].delta.content
+        chunks.append(delta)
+        
+        # Braces inside strings can throw the count off; that only costs a wasted
+        # decode or a full read, never a wrong result
+        depth += delta.count("{") - delta.count("}")
+        if depth <= 0 and "}" in delta:
+            found = _first_json_object("".join(chunks))
+            if found is not None:
+                # Stop generating trailing tokens nobody will read
+                await stream.close()
+                return found, prompt_tokens + len(chunks), True
+    
+    text = "".join(chunks)
+    if tokens_used is None:
+        tokens_used = prompt_tokens + len(chunks)
+    found = _first_json_object(text)
+    if found is not None:
+        return found, tokens_used, True
+    return text, tokens_used, False
+
 class TextToAPKEngine:
     """
     Core engine for converting natural language descriptions into Android APKs
     """
     
-    def __init__(self, openai_api_key: Optional[str] = None):
-        """Initialize the Text-to-APK engine"""
+    def __init__(
+        self,
+        openai_api_key: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        cache_path: Optional[Union[str, Path]] = None,
+        templated_fast_path: bool = False,
+        max_concurrent_llm: int = DEFAULT_LLM_CONCURRENCY,
+        max_concurrent_builds: Optional[int] = None
+    ):
+        """
+        Initialize the Text-to-APK engine
+        
+        Args:
+            openai_api_key: OpenAI API key; without it the keyword-based fallbacks are used
+            http_client: Optional shared HTTP client so OpenAI calls reuse pooled connections
+            cache_path: Optional SQLite file so cached LLM responses survive restarts
+                and are shared between worker processes
+            templated_fast_path: Analyze prompts that follow a known template with
+                regexes and keywords instead of calling the LLM
+            max_concurrent_llm: LLM requests allowed in flight at once (rate limits)
+            max_concurrent_builds: APK builds allowed at once; defaults to the CPU count
+        """
         self.openai_client = None
+        self._http = None
+        self._owns_http = False
         if openai_api_key:
-            openai.api_key = openai_api_key
-            self.openai_client = openai
+            # Both LLM calls per prompt share one pooled HTTP/2 connection
+            if http_client is None:
+                http_client = httpx.AsyncClient(
+                    http2=True,
+                    timeout=httpx.Timeout(60.0, connect=10.0),
+                    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+                )
+                self._owns_http = True
+            self._http = http_client
+            self.openai_client = openai.AsyncOpenAI(api_key=openai_api_key, http_client=http_client)
         
         self.templates_path = Path(__file__).parent.parent / "templates"
         self.build_path = Path(__file__).parent.parent / "builds"
         self.build_path.mkdir(exist_ok=True)
         
+        # Exact-match cache of LLM responses: identical requests skip the API entirely
+        self.response_cache = ResponseCache(path=cache_path)
+        self.templated_fast_path = templated_fast_path
+        # Requests currently awaiting the API, by cache key
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Concurrent generations overlap, but LLM calls and builds are bounded
+        self._llm_slots = asyncio.Semaphore(max_concurrent_llm)
+        self.max_concurrent_builds = max_concurrent_builds or os.cpu_count() or 4
+        self._build_slots = asyncio.Semaphore(self.max_concurrent_builds)
+        # Builds holding a slot and generations waiting for one, for admission control
+        self.builds_running = 0
+        self.builds_waiting = 0
+        
         # Initialize framework builders
-        self.framework_builders = {
-            AppFramework.REACT_NATIVE: ReactNativeBuilder(),
-            AppFramework.FLUTTER: FlutterBuilder(),
-            AppFramework.KIVY: KivyBuilder(),
-            AppFramework.CORDOVA: CordovaBuilder(),
-            AppFramework.NATIVE_ANDROID: NativeAndroidBuilder()
-        }
+        self.framework_builders = create_framework_builders()
     
-    async def generate_apk_from_text(self, prompt: str, user_preferences: Optional[Dict] = None) -> Dict[str, Any]:
+    @asynccontextmanager
+    async def build_slot(self):
+        """Hold one of the bounded build slots, counting waiters and running builds"""
+        self.builds_waiting += 1
+        try:
+            await self._build_slots.acquire()
+        finally:
+            self.builds_waiting -= 1
+        
+        self.builds_running += 1
+        try:
+            yield
+        finally:
+            self.builds_running -= 1
+            self._build_slots.release()
+    
+    def close(self):
+        """Release the response cache database"""
+        self.response_cache.close()
+    
+    async def aclose(self):
+        """Close the pooled HTTP client if this instance created it, and the cache database"""
+        self.close()
+        if self._owns_http and self._http is not None:
+            await self._http.aclose()
+    
+    async def generate_apk_from_text(
+        self,
+        prompt: str,
+        user_preferences: Optional[Dict] = None,
+        progress_cb: Optional[Callable[[int, str], Awaitable[None]]] = None,
+        build_executor: Optional[Executor] = None
+    ) -> Dict[str, Any]:
         """
         Main pipeline: Convert text prompt to APK
         
         Args:
             prompt: Natural language description of the desired app
             user_preferences: Optional user preferences for framework, style, etc.
+            progress_cb: Optional coroutine called with (progress, stage) as each pipeline stage starts
+            build_executor: Optional executor (e.g. a ProcessPoolExecutor) that runs the
+                CPU-bound APK build off the event loop
             
         Returns:
             Dictionary containing APK path, metadata, and generation details
@@ -100,20 +301,18 @@ class TextToAPKEngine:
         try:
             logger.info(f"Starting APK generation from prompt: {prompt[:100]}...")
             
-            # Step 1: Analyze prompt and extract app specification
-            app_spec = await self.analyze_prompt(prompt, user_preferences)
-            logger.info(f"Generated app specification: {app_spec.name}")
-            
-            # Step 2: Generate application architecture
-            architecture = await self.generate_architecture(app_spec)
-            logger.info(f"Generated architecture for {app_spec.framework.value}")
-            
-            # Step 3: Generate source code
-            source_code = await self.generate_source_code(app_spec, architecture)
-            logger.info("Generated source code successfully")
+            # Steps 1-3: Prompt analysis, architecture and source code (I/O bound)
+            app_spec, source_code = await self.prepare(prompt, user_preferences, progress_cb)
             
             # Step 4: Build APK
-            apk_result = await self.build_apk(app_spec, source_code)
+            if progress_cb is not None:
+                await progress_cb(90, "Building APK file")
+            async with self.build_slot():
+                if build_executor is not None:
+                    loop = asyncio.get_running_loop()
+                    apk_result = await loop.run_in_executor(build_executor, build_apk_blocking, app_spec, source_code)
+                else:
+                    apk_result = await self.build_apk(app_spec, source_code)
             logger.info(f"APK built successfully: {apk_result['apk_path']}")
             
             return {
@@ -137,36 +336,54 @@ class TextToAPKEngine:
                 "stage": "unknown"
             }
     
-    async def analyze_prompt(self, prompt: str, user_preferences: Optional[Dict] = None) -> AppSpecification:
+    async def prepare(
+        self,
+        prompt: str,
+        user_preferences: Optional[Dict] = None,
+        progress_cb: Optional[Callable[[int, str], Awaitable[None]]] = None
+    ) -> Tuple[AppSpecification, Dict[str, str]]:
         """
-        Analyze natural language prompt and extract structured app specification
+        Turn a prompt into an app specification and generated source code, ready to build
         """
-        # Enhanced prompt for GPT-4 to extract app specifications
-        analysis_prompt = f"""
-        Analyze the following app description and extract structured information:
+        async def report(progress: int, stage: str):
+            if progress_cb is not None:
+                await progress_cb(progress, stage)
         
-        User Request: "{prompt}"
+        # Step 1: Analyze prompt and extract app specification
+        await report(20, "Analyzing prompt and extracting requirements")
+        app_spec = await self.analyze_prompt(prompt, user_preferences)
+        logger.info(f"Generated app specification: {app_spec.name}")
         
-        Extract and return a JSON object with these fields:
-        - name: App name (generate if not specified)
-        - description: Detailed app description
-        - category: One of [productivity, utility, entertainment, business, education, social, health, finance]
-        - framework: Recommended framework [react_native, flutter, kivy, cordova, native_android]
-        - features: List of main features
-        - ui_style: UI/UX style description
-        - target_audience: Target user demographic
-        - complexity_level: Complexity on 1-10 scale
-        - api_integrations: Required external APIs
-        - permissions: Required Android permissions
+        # Step 2: Generate application architecture
+        await report(40, "Generating application architecture")
+        architecture = await self.generate_architecture(app_spec)
+        logger.info(f"Generated architecture for {app_spec.framework.value}")
         
-        Consider user preferences: {user_preferences or 'None specified'}
+        # Step 3: Generate source code
+        await report(70, "Generating source code")
+        source_code = await self.generate_source_code(app_spec, architecture)
+        logger.info("Generated source code successfully")
         
-        Respond with valid JSON only.
+        return app_spec, source_code
+    
+    async def analyze_prompt(self, prompt: str, user_preferences: Optional[Dict] = None) -> AppSpecification:
         """
+        Analyze natural language prompt and extract structured app specification
+        """
+        if self.templated_fast_path:
+            app_spec = self._analyze_templated_prompt(prompt, user_preferences)
+            if app_spec is not None:
+                return app_spec
+        
+        # Static instructions first so repeat calls share a cacheable prefix
+        messages = [
+            {"role": "system", "content": ANALYSIS_INSTRUCTIONS},
+            {"role": "user", "content": f'User Request: "{prompt}"\n\nConsider user preferences: {user_preferences or "None specified"}'}
+        ]
         
         if self.openai_client:
             try:
-                response = await self._call_openai(analysis_prompt)
+                response = await self._call_openai(messages)
                 spec_data = json.loads(response)
                 
                 return AppSpecification(
@@ -191,26 +408,19 @@ class TextToAPKEngine:
         """
         Generate application architecture based on specification
         """
-        architecture_prompt = f"""
-        Generate a detailed application architecture for:
-        
-        App: {app_spec.name}
-        Framework: {app_spec.framework.value}
-        Features: {', '.join(app_spec.features)}
-        Complexity: {app_spec.complexity_level}/10
-        
-        Return JSON with:
-        - components: List of UI components needed
-        - screens: List of app screens/pages
-        - navigation: Navigation structure
-        - data_flow: Data management approach
-        - external_services: Required external integrations
-        - file_structure: Recommended project file structure
-        """
+        messages = [
+            {"role": "system", "content": ARCHITECTURE_INSTRUCTIONS},
+            {"role": "user", "content": (
+                f"App: {app_spec.name}\n"
+                f"Framework: {app_spec.framework.value}\n"
+                f"Features: {', '.join(app_spec.features)}\n"
+                f"Complexity: {app_spec.complexity_level}/10"
+            )}
+        ]
         
         if self.openai_client:
             try:
-                response = await self._call_openai(architecture_prompt)
+                response = await self._call_openai(messages)
                 return json.loads(response)
             except Exception as e:
                 logger.warning(f"Architecture generation failed, using template: {e}")
@@ -232,38 +442,71 @@ class TextToAPKEngine:
         builder = self.framework_builders[app_spec.framework]
         return await builder.build_apk(app_spec, source_code)
     
-    async def _call_openai(self, prompt: str) -> str:
-        """Call OpenAI API with error handling"""
+    async def _call_openai(self, messages: List[Dict[str, str]]) -> str:
+        """Call OpenAI API with error handling, answering repeat requests from the cache"""
+        key = hashlib.blake2b(
+            json.dumps([ENGINE_MODEL.value, messages], sort_keys=True).encode("utf-8"),
+            digest_size=16
+        ).hexdigest()
+        cached = await self.response_cache.get(key)
+        if cached is not None:
+            return cached.content
+        
+        # Concurrent identical requests share one API call; shielded so a
+        # cancelled caller doesn't cancel it for the others
+        request = self._inflight.get(key)
+        if request is None:
+            request = asyncio.ensure_future(self._request_completion(key, messages))
+            self._inflight[key] = request
+            request.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(request)
+    
+    async def _request_completion(self, key: str, messages: List[Dict[str, str]]) -> str:
+        """Send one chat completion request and cache its response if it holds a JSON object"""
         try:
-            response = await self.openai_client.ChatCompletion.acreate(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=2000,
-                temperature=0.7
-            )
-            return response.choices[0].message.content
+            async with self._llm_slots:
+                start_time = time.monotonic()
+                stream = await self.openai_client.chat.completions.create(
+                    model=ENGINE_MODEL.value,
+                    messages=messages,
+                    max_tokens=2000,
+                    temperature=0.7,
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
+                # ~4 characters per token for the input
+                prompt_tokens = sum(len(message["content"]) for message in messages) // 4
+                content, tokens_used, complete = await _read_json_stream(stream, prompt_tokens)
         except Exception as e:
             logger.error(f"OpenAI API call failed: {e}")
             raise
+        
+        # Truncated or prose replies are retried next time rather than served for the TTL
+        if complete:
+            await self.response_cache.set(key, AIResponse(
+                content=content,
+                model=ENGINE_MODEL,
+                prompt_hash=key,
+                tokens_used=tokens_used,
+                response_time=time.monotonic() - start_time
+            ))
+        return content
+    
+    def _analyze_templated_prompt(self, prompt: str, user_preferences: Optional[Dict]) -> Optional[AppSpecification]:
+        """Analyze a prompt following a known template without the LLM, or None if it doesn't"""
+        match = _TEMPLATED_PROMPT_RE.match(prompt)
+        if match is None or self._detect_category(prompt.lower()) is None:
+            return None
+        
+        app_spec = self._fallback_prompt_analysis(prompt, user_preferences)
+        return replace(app_spec, name=f"{match['subject'].strip().title()} App")
     
     def _fallback_prompt_analysis(self, prompt: str, user_preferences: Optional[Dict]) -> AppSpecification:
         """Fallback prompt analysis using keyword matching"""
         prompt_lower = prompt.lower()
         
         # Determine category
-        category_keywords = {
-            AppCategory.PRODUCTIVITY: ["todo", "task", "note", "calendar", "reminder"],
-            AppCategory.UTILITY: ["calculator", "converter", "tool", "scanner"],
-            AppCategory.ENTERTAINMENT: ["game", "music", "video", "photo"],
-            AppCategory.BUSINESS: ["inventory", "sales", "crm", "analytics"],
-            AppCategory.EDUCATION: ["quiz", "learn", "study", "dictionary"]
-        }
-        
-        category = AppCategory.UTILITY
-        for cat, keywords in category_keywords.items():
-            if any(keyword in prompt_lower for keyword in keywords):
-                category = cat
-                break
+        category = self._detect_category(prompt_lower) or AppCategory.UTILITY
         
         # Determine framework based on complexity and preferences
         framework = AppFramework.REACT_NATIVE
@@ -287,24 +530,17 @@ class TextToAPKEngine:
             permissions=["INTERNET"]
         )
     
+    def _detect_category(self, prompt_lower: str) -> Optional[AppCategory]:
+        """Detect the app category from keywords, or None if no keyword matches"""
+        for category, pattern in _CATEGORY_PATTERNS.items():
+            if pattern.search(prompt_lower):
+                return category
+        return None
+    
     def _extract_features(self, prompt: str) -> List[str]:
         """Extract features from prompt using keyword matching"""
-        feature_keywords = {
-            "authentication": ["login", "signup", "auth", "account"],
-            "data_storage": ["save", "store", "database", "persist"],
-            "networking": ["api", "sync", "cloud", "server"],
-            "camera": ["photo", "camera", "picture", "scan"],
-            "location": ["gps", "location", "map", "navigation"],
-            "notifications": ["notify", "alert", "reminder", "push"]
-        }
-        
-        features = []
         prompt_lower = prompt.lower()
-        
-        for feature, keywords in feature_keywords.items():
-            if any(keyword in prompt_lower for keyword in keywords):
-                features.append(feature)
-        
+        features = [feature for feature, pattern in _FEATURE_PATTERNS.items() if pattern.search(prompt_lower)]
         return features or ["basic_ui", "data_display"]
     
     def _get_template_architecture(self, app_spec: AppSpecification) -> Dict[str, Any]:
@@ -320,6 +556,36 @@ class TextToAPKEngine:
             }
         }
 
+# Source templates for the framework builders, parsed once at import time
+ENGINE_TEMPLATES_DIR = Path(__file__).parent / "templates" / "engine"
+
+def _load_template(name: str) -> Template:
+    return Template((ENGINE_TEMPLATES_DIR / f"{name}.tmpl").read_text(encoding="utf-8"))
+
+_BUILD_GRADLE_TEMPLATE = _load_template("build.gradle")
+# Parallel execution, build cache and configuration cache for every Gradle-based
+# project, so concurrent builds reuse task outputs and a warm daemon
+_GRADLE_PROPERTIES = (ENGINE_TEMPLATES_DIR / "gradle.properties.tmpl").read_text(encoding="utf-8")
+_RN_APP_JS_TEMPLATE = _load_template("react_native/App.js")
+_FLUTTER_MAIN_DART_TEMPLATE = _load_template("flutter/main.dart")
+_FLUTTER_PUBSPEC_TEMPLATE = _load_template("flutter/pubspec.yaml")
+_KIVY_MAIN_PY_TEMPLATE = _load_template("kivy/main.py")
+_KIVY_BUILDOZER_SPEC_TEMPLATE = _load_template("kivy/buildozer.spec")
+_CORDOVA_INDEX_HTML_TEMPLATE = _load_template("cordova/index.html")
+_CORDOVA_CONFIG_XML_TEMPLATE = _load_template("cordova/config.xml")
+_NATIVE_MAIN_ACTIVITY_TEMPLATE = _load_template("native_android/MainActivity.java")
+_NATIVE_MANIFEST_TEMPLATE = _load_template("native_android/AndroidManifest.xml")
+
+def _template_values(app_spec: AppSpecification) -> Dict[str, str]:
+    """Values substituted into the framework source templates"""
+    return {
+        "name": app_spec.name,
+        "description": app_spec.description,
+        "class_name": app_spec.name.replace(" ", ""),
+        "package_id": app_spec.name.lower().replace(" ", ""),
+        "slug": app_spec.name.lower().replace(" ", "_")
+    }
+
 class FrameworkBuilder:
     """Base class for framework-specific builders"""
     
@@ -339,7 +605,8 @@ class ReactNativeBuilder(FrameworkBuilder):
         return {
             "App.js": self._generate_app_js(app_spec, architecture),
             "package.json": self._generate_package_json(app_spec),
-            "android/app/build.gradle": self._generate_build_gradle(app_spec)
+            "android/app/build.gradle": self._generate_build_gradle(app_spec),
+            "android/gradle.properties": _GRADLE_PROPERTIES
         }
     
     async def build_apk(self, app_spec: AppSpecification, source_code: Dict[str, str]) -> Dict[str, Any]:
@@ -348,40 +615,7 @@ class ReactNativeBuilder(FrameworkBuilder):
         return {"apk_path": "path/to/app.apk", "build_logs": [], "build_time": 120}
     
     def _generate_app_js(self, app_spec: AppSpecification, architecture: Dict[str, Any]) -> str:
-        return f"""
-import React from 'react';
-import {{ View, Text, StyleSheet }} from 'react-native';
-
-const App = () => {{
-  return (
-    <View style={{styles.container}}>
-      <Text style={{styles.title}}>{app_spec.name}</Text>
-      <Text style={{styles.description}}>{app_spec.description}</Text>
-    </View>
-  );
-}};
-
-const styles = StyleSheet.create({{
-  container: {{
-    flex: 1,
-    justifyContent: 'center',
-    alignItems: 'center',
-    backgroundColor: '#f0f0f0',
-  }},
-  title: {{
-    fontSize: 24,
-    fontWeight: 'bold',
-    marginBottom: 10,
-  }},
-  description: {{
-    fontSize: 16,
-    textAlign: 'center',
-    margin: 20,
-  }},
-}});
-
-export default App;
-"""
+        return _RN_APP_JS_TEMPLATE.substitute(_template_values(app_spec))
     
     def _generate_package_json(self, app_spec: AppSpecification) -> str:
         return json.dumps({
@@ -396,18 +630,7 @@ export default App;
         }, indent=2)
     
     def _generate_build_gradle(self, app_spec: AppSpecification) -> str:
-        return f"""
-android {{
-    compileSdkVersion 33
-    defaultConfig {{
-        applicationId "com.singularity.{app_spec.name.lower().replace(' ', '')}"
-        minSdkVersion 21
-        targetSdkVersion 33
-        versionCode 1
-        versionName "1.0"
-    }}
-}}
-"""
+        return _BUILD_GRADLE_TEMPLATE.substitute(_template_values(app_spec))
 
 class FlutterBuilder(FrameworkBuilder):
     """Flutter application builder"""
@@ -422,80 +645,10 @@ class FlutterBuilder(FrameworkBuilder):
         return {"apk_path": "path/to/app.apk", "build_logs": [], "build_time": 180}
     
     def _generate_main_dart(self, app_spec: AppSpecification) -> str:
-        return f"""
-import 'package:flutter/material.dart';
-
-void main() {{
-  runApp(MyApp());
-}}
-
-class MyApp extends StatelessWidget {{
-  @override
-  Widget build(BuildContext context) {{
-    return MaterialApp(
-      title: '{app_spec.name}',
-      theme: ThemeData(
-        primarySwatch: Colors.blue,
-      ),
-      home: MyHomePage(title: '{app_spec.name}'),
-    );
-  }}
-}}
-
-class MyHomePage extends StatefulWidget {{
-  MyHomePage({{Key? key, required this.title}}) : super(key: key);
-  final String title;
-
-  @override
-  _MyHomePageState createState() => _MyHomePageState();
-}}
-
-class _MyHomePageState extends State<MyHomePage> {{
-  @override
-  Widget build(BuildContext context) {{
-    return Scaffold(
-      appBar: AppBar(
-        title: Text(widget.title),
-      ),
-      body: Center(
-        child: Column(
-          mainAxisAlignment: MainAxisAlignment.center,
-          children: <Widget>[
-            Text(
-              '{app_spec.description}',
-              style: Theme.of(context).textTheme.headline6,
-              textAlign: TextAlign.center,
-            ),
-          ],
-        ),
-      ),
-    );
-  }}
-}}
-"""
+        return _FLUTTER_MAIN_DART_TEMPLATE.substitute(_template_values(app_spec))
     
     def _generate_pubspec_yaml(self, app_spec: AppSpecification) -> str:
-        return f"""
-name: {app_spec.name.lower().replace(" ", "_")}
-description: {app_spec.description}
-version: 1.0.0+1
-
-environment:
-  sdk: ">=2.17.0 <4.0.0"
-
-dependencies:
-  flutter:
-    sdk: flutter
-  cupertino_icons: ^1.0.2
-
-dev_dependencies:
-  flutter_test:
-    sdk: flutter
-  flutter_lints: ^2.0.0
-
-flutter:
-  uses-material-design: true
-"""
+        return _FLUTTER_PUBSPEC_TEMPLATE.substitute(_template_values(app_spec))
 
 class KivyBuilder(FrameworkBuilder):
     """Python Kivy application builder"""
@@ -510,50 +663,10 @@ class KivyBuilder(FrameworkBuilder):
         return {"apk_path": "path/to/app.apk", "build_logs": [], "build_time": 300}
     
     def _generate_main_py(self, app_spec: AppSpecification) -> str:
-        return f"""
-from kivy.app import App
-from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.label import Label
-
-class {app_spec.name.replace(" ", "")}App(App):
-    def build(self):
-        layout = BoxLayout(orientation='vertical', padding=20, spacing=10)
-        
-        title_label = Label(
-            text='{app_spec.name}',
-            font_size='24sp',
-            size_hint_y=None,
-            height='60dp'
-        )
-        
-        desc_label = Label(
-            text='{app_spec.description}',
-            font_size='16sp',
-            text_size=(None, None),
-            halign='center'
-        )
-        
-        layout.add_widget(title_label)
-        layout.add_widget(desc_label)
-        
-        return layout
-
-if __name__ == '__main__':
-    {app_spec.name.replace(" ", "")}App().run()
-"""
+        return _KIVY_MAIN_PY_TEMPLATE.substitute(_template_values(app_spec))
     
     def _generate_buildozer_spec(self, app_spec: AppSpecification) -> str:
-        return f"""
-[app]
-title = {app_spec.name}
-package.name = {app_spec.name.lower().replace(" ", "")}
-package.domain = com.singularity.{app_spec.name.lower().replace(" ", "")}
-source.dir = .
-version = 1.0
-requirements = python3,kivy
-[buildozer]
-log_level = 2
-"""
+        return _KIVY_BUILDOZER_SPEC_TEMPLATE.substitute(_template_values(app_spec))
 
 class CordovaBuilder(FrameworkBuilder):
     """Apache Cordova application builder"""
@@ -568,61 +681,10 @@ class CordovaBuilder(FrameworkBuilder):
         return {"apk_path": "path/to/app.apk", "build_logs": [], "build_time": 90}
     
     def _generate_index_html(self, app_spec: AppSpecification) -> str:
-        return f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <title>{app_spec.name}</title>
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            margin: 0;
-            padding: 20px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            text-align: center;
-        }}
-        .container {{
-            max-width: 600px;
-            margin: 0 auto;
-            padding: 40px 20px;
-        }}
-        h1 {{
-            font-size: 2.5em;
-            margin-bottom: 20px;
-        }}
-        p {{
-            font-size: 1.2em;
-            line-height: 1.6;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>{app_spec.name}</h1>
-        <p>{app_spec.description}</p>
-    </div>
-</body>
-</html>
-"""
+        return _CORDOVA_INDEX_HTML_TEMPLATE.substitute(_template_values(app_spec))
     
     def _generate_config_xml(self, app_spec: AppSpecification) -> str:
-        return f"""
-<?xml version='1.0' encoding='utf-8'?>
-<widget id="com.singularity.{app_spec.name.lower().replace(' ', '')}" version="1.0.0" xmlns="http://www.w3.org/ns/widgets">
-    <name>{app_spec.name}</name>
-    <description>{app_spec.description}</description>
-    <author email="dev@singularity.com">Project Singularity</author>
-    <content src="index.html" />
-    <access origin="*" />
-    <platform name="android">
-        <preference name="android-minSdkVersion" value="21" />
-        <preference name="android-targetSdkVersion" value="33" />
-    </platform>
-</widget>
-"""
+        return _CORDOVA_CONFIG_XML_TEMPLATE.substitute(_template_values(app_spec))
 
 class NativeAndroidBuilder(FrameworkBuilder):
     """Native Android application builder"""
@@ -631,83 +693,41 @@ class NativeAndroidBuilder(FrameworkBuilder):
         return {
             "app/src/main/java/MainActivity.java": self._generate_main_activity(app_spec),
             "app/src/main/AndroidManifest.xml": self._generate_manifest(app_spec),
-            "app/build.gradle": self._generate_build_gradle(app_spec)
+            "app/build.gradle": self._generate_build_gradle(app_spec),
+            "gradle.properties": _GRADLE_PROPERTIES
         }
     
     async def build_apk(self, app_spec: AppSpecification, source_code: Dict[str, str]) -> Dict[str, Any]:
         return {"apk_path": "path/to/app.apk", "build_logs": [], "build_time": 150}
     
     def _generate_main_activity(self, app_spec: AppSpecification) -> str:
-        package_name = f"com.singularity.{app_spec.name.lower().replace(' ', '')}"
-        return f"""
-package {package_name};
-
-import android.app.Activity;
-import android.os.Bundle;
-import android.widget.TextView;
-import android.widget.LinearLayout;
-
-public class MainActivity extends Activity {{
-    @Override
-    protected void onCreate(Bundle savedInstanceState) {{
-        super.onCreate(savedInstanceState);
-        
-        LinearLayout layout = new LinearLayout(this);
-        layout.setOrientation(LinearLayout.VERTICAL);
-        layout.setPadding(40, 40, 40, 40);
-        
-        TextView titleView = new TextView(this);
-        titleView.setText("{app_spec.name}");
-        titleView.setTextSize(24);
-        
-        TextView descView = new TextView(this);
-        descView.setText("{app_spec.description}");
-        descView.setTextSize(16);
-        
-        layout.addView(titleView);
-        layout.addView(descView);
-        
-        setContentView(layout);
-    }}
-}}
-"""
+        return _NATIVE_MAIN_ACTIVITY_TEMPLATE.substitute(_template_values(app_spec))
     
     def _generate_manifest(self, app_spec: AppSpecification) -> str:
-        package_name = f"com.singularity.{app_spec.name.lower().replace(' ', '')}"
-        return f"""
-<?xml version="1.0" encoding="utf-8"?>
-<manifest xmlns:android="http://schemas.android.com/apk/res/android"
-    package="{package_name}">
-    
-    <application
-        android:allowBackup="true"
-        android:label="{app_spec.name}"
-        android:theme="@android:style/Theme.Material.Light">
-        <activity
-            android:name=".MainActivity"
-            android:exported="true">
-            <intent-filter>
-                <action android:name="android.intent.action.MAIN" />
-                <category android:name="android.intent.category.LAUNCHER" />
-            </intent-filter>
-        </activity>
-    </application>
-</manifest>
-"""
+        return _NATIVE_MANIFEST_TEMPLATE.substitute(_template_values(app_spec))
     
     def _generate_build_gradle(self, app_spec: AppSpecification) -> str:
-        return f"""
-android {{
-    compileSdkVersion 33
-    defaultConfig {{
-        applicationId "com.singularity.{app_spec.name.lower().replace(' ', '')}"
-        minSdkVersion 21
-        targetSdkVersion 33
-        versionCode 1
-        versionName "1.0"
-    }}
-}}
-"""
+        return _BUILD_GRADLE_TEMPLATE.substitute(_template_values(app_spec))
+
+def create_framework_builders() -> Dict[AppFramework, FrameworkBuilder]:
+    """Create one builder per supported framework"""
+    return {
+        AppFramework.REACT_NATIVE: ReactNativeBuilder(),
+        AppFramework.FLUTTER: FlutterBuilder(),
+        AppFramework.KIVY: KivyBuilder(),
+        AppFramework.CORDOVA: CordovaBuilder(),
+        AppFramework.NATIVE_ANDROID: NativeAndroidBuilder()
+    }
+
+def build_apk_blocking(app_spec: AppSpecification, source_code: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Build an APK synchronously
+    
+    Module-level (and therefore picklable) entry point for running builds in an
+    executor such as a ProcessPoolExecutor.
+    """
+    builder = create_framework_builders()[app_spec.framework]
+    return asyncio.run(builder.build_apk(app_spec, source_code))
 
 # Example usage and testing
 if __name__ == "__main__":
@@ -722,10 +742,11 @@ if __name__ == "__main__":
             "Create a QR code scanner app with flashlight toggle"
         ]
         
-        for prompt in test_prompts:
+        # The pipeline is I/O bound, so all prompts run concurrently
+        results = await asyncio.gather(*(engine.generate_apk_from_text(prompt) for prompt in test_prompts))
+        
+        for prompt, result in zip(test_prompts, results):
             print(f"\n🚀 Testing: {prompt}")
-            result = await engine.generate_apk_from_text(prompt)
-            
             if result["success"]:
                 print(f"✅ Success: {result['app_specification']['name']}")
                 print(f"📱 Framework: {result['app_specification']['framework']}")
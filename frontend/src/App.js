@@ -60,13 +60,17 @@ function App() {
   const setupWebSocket = (genId) => {
     const wsUrl = `ws://localhost:8000/ws/${genId}`;
     wsRef.current = new WebSocket(wsUrl);
+    // Updates arrive as binary UTF-8 JSON frames
+    wsRef.current.binaryType = 'arraybuffer';
     
     wsRef.current.onopen = () => {
       console.log('WebSocket connected');
     };
     
     wsRef.current.onmessage = (event) => {
-      const data = JSON.parse(event.data);
+      const data = JSON.parse(
+        typeof event.data === 'string' ? event.data : new TextDecoder().decode(event.data)
+      );
       
       if (data.type === 'status_update') {
         setStatus(data.status);
@@ -81,8 +85,6 @@ function App() {
         setCurrentStage('Completed');
         setDownloadUrl(`${API_BASE_URL}/download/${genId}`);
         loadHistory(); // Refresh history
-      } else if (data.type === 'ping') {
-        // Keep-alive ping, no action needed
       }
     };
     
@@ -192,7 +192,7 @@ HEALTHCHECK --interval=30s --timeout=10s --start-period=5s --retries=3 \\
     CMD curl -f http://localhost:8000/health || exit 1
 
 # Start command
-CMD ["uvicorn", "api.main:app", "--host", "0.0.0.0", "--port", "8000"]
+CMD ["gunicorn", "api.main:app", "-c", "api/gunicorn_conf.py"]
 '''
     
     def _generate_frontend_dockerfile(self) -> str:
@@ -398,8 +398,7 @@ CMD ["nginx", "-g", "daemon off;"]
         manifest_files = {}
         for name, content in manifests.items():
             file_path = self.deployment_dir / f"{name}.yaml"
-            with open(file_path, 'w') as f:
-                f.write(content)
+            file_path.write_bytes(content.encode("utf-8"))
             manifest_files[name] = str(file_path)
         
         return manifest_files
@@ -446,6 +445,8 @@ spec:
         env:
         - name: ENVIRONMENT
           value: {self.config.environment}
+        - name: CORS_ORIGINS
+          value: "https://{self.config.domain}"
         - name: OPENAI_API_KEY
           valueFrom:
             secretKeyRef:
@@ -784,8 +785,8 @@ spec:{tls_config}
         
         # Save summary to file
         summary_file = self.deployment_dir / f"deployment-summary-{self.version}.json"
-        with open(summary_file, 'w') as f:
-            json.dump(summary, f, indent=2)
+        # Serialize first and write once rather than streaming many small writes
+        summary_file.write_bytes(json.dumps(summary, indent=2).encode("utf-8"))
         
         return summary
 
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the Project Singularity API
+Covers generation state stores, update coalescing, the reaper and HTTP endpoints
+"""
+
+import pytest
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock, patch
+import fakeredis.aioredis
+from fastapi.testclient import TestClient
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api.main as main
+from api.main import Generation, InMemoryGenerationStore, RedisGenerationStore, UpdateCoalescer
+
+@pytest.fixture(params=["memory", "redis"])
+def store(request):
+    """Each generation store implementation"""
+    if request.param == "memory":
+        return InMemoryGenerationStore()
+    return RedisGenerationStore(fakeredis.aioredis.FakeRedis(decode_responses=True))
+
+@pytest.fixture
+def client():
+    """Test client with an in-memory store and no lifespan resources"""
+    main.app.state.store = InMemoryGenerationStore()
+    main.app.state.redis = None
+    return TestClient(main.app)
+
+class TestGenerationStore:
+    """Test suite for the generation state stores"""
+
+    @pytest.mark.asyncio
+    async def test_update_finish_history_round_trip(self, store):
+        """Test that a generation moves from active to history exactly once"""
+        await store.create(Generation(id="gen-1", prompt="A notes app", user_id="alice"))
+        await store.create(Generation(id="gen-2", prompt="A weather app"))
+
+        assert await store.update("gen-1", {"status": "processing", "progress": 40}) is True
+        assert (await store.get_active("gen-1")).progress == 40
+        assert await store.counts() == (2, 0)
+
+        assert await store.finish("gen-1", {"status": "completed", "progress": 100}) is True
+        # The reaper losing the race must not overwrite the completed entry
+        assert await store.finish("gen-1", {"status": "failed"}) is False
+        assert await store.update("gen-1", {"progress": 50}) is False
+
+        assert await store.get_active("gen-1") is None
+        assert (await store.get_completed("gen-1")).status == "completed"
+        assert await store.counts() == (1, 1)
+
+        history, total = await store.history(10)
+        user_history, user_total = await store.history(10, user_id="alice")
+        assert [entry["id"] for entry in history] == ["gen-1"]
+        assert history[0]["status"] == "completed"
+        assert total == user_total == 1
+        assert user_history == history
+
+    @pytest.mark.asyncio
+    async def test_stale_includes_queued_generations(self, store):
+        """Test that generations left queued or processing past the cutoff are reapable"""
+        old_ns = time.time_ns() - 10_000_000_000
+        await store.create(Generation(id="queued", prompt="A queued app", created_at_ns=old_ns))
+        await store.create(Generation(id="running", prompt="A running app", status="processing", created_at_ns=old_ns))
+        await store.create(Generation(id="fresh", prompt="A fresh app"))
+
+        stale = await store.stale(time.time_ns() - 1_000_000_000)
+
+        assert sorted(stale) == ["queued", "running"]
+
+class TestUpdateCoalescer:
+    """Test suite for WebSocket update coalescing"""
+
+    @pytest.mark.asyncio
+    async def test_bursts_collapse_into_last_state(self):
+        """Test that a burst sends the first update now and only the latest one later"""
+        sent = []
+
+        async def send(generation_id, data):
+            sent.append(data["progress"])
+
+        coalescer = UpdateCoalescer(send, interval=0.05)
+        for progress in (10, 20, 30, 40):
+            await coalescer.push("gen-1", {"status": "processing", "progress": progress})
+
+        assert sent == [10]
+        await asyncio.sleep(0.1)
+        assert sent == [10, 40]
+
+        # Terminal states are delivered immediately
+        await coalescer.push("gen-1", {"status": "processing", "progress": 50})
+        await coalescer.push("gen-1", {"status": "completed", "progress": 100})
+        assert sent[-1] == 100
+        await asyncio.sleep(0.1)
+        assert sent[-1] == 100
+
+class TestReaper:
+    """Test suite for the stale generation reaper"""
+
+    @pytest.mark.asyncio
+    async def test_reaper_moves_stale_generations_to_history(self):
+        """Test that stale generations are failed and announced, fresh ones left alone"""
+        store = InMemoryGenerationStore()
+        main.app.state.store = store
+        await store.create(Generation(id="stale", prompt="A stuck app", status="processing", created_at_ns=1))
+        await store.create(Generation(id="fresh", prompt="A running app", status="processing"))
+
+        with patch.object(main, "REAPER_INTERVAL_SECONDS", 0), \
+             patch.object(main, "publish_update", new_callable=AsyncMock) as mock_publish:
+            reaper = asyncio.create_task(main.reap_stale_generations())
+            for _ in range(100):
+                if await store.get_completed("stale") is not None:
+                    break
+                await asyncio.sleep(0.01)
+            reaper.cancel()
+
+        reaped = await store.get_completed("stale")
+        assert reaped.status == "failed"
+        assert reaped.error == "Generation timed out"
+        assert await store.get_active("fresh") is not None
+        mock_publish.assert_awaited_once()
+        assert mock_publish.call_args.args[0] == "stale"
+
+class TestEndpoints:
+    """Test suite for the HTTP endpoints"""
+
+    def test_generate_returns_503_when_builds_are_saturated(self, client):
+        """Test that generations are shed instead of queued when the engine's build backlog is full"""
+        main.app.state.engine = Mock(builds_waiting=main.MAX_QUEUED_BUILDS)
+        with patch.object(main, "process_generation", new_callable=AsyncMock) as mock_process:
+            response = client.post("/generate", json={"prompt": "Create a simple notes app"})
+
+        assert response.status_code == 503
+        mock_process.assert_not_called()
+
+    def test_generate_rejects_whitespace_only_prompt(self, client):
+        """Test that a prompt padded out with whitespace fails the length check"""
+        with patch.object(main, "process_generation", new_callable=AsyncMock) as mock_process:
+            response = client.post("/generate", json={"prompt": " " * 20 + "\n\t"})
+
+        assert response.status_code == 422
+        mock_process.assert_not_called()
+
+    def test_download_returns_304_for_matching_etag(self, client):
+        """Test that a client holding the current APK gets a 304 instead of the file"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            apk_path = Path(temp_dir) / "app.apk"
+            apk_path.write_bytes(b"apk contents")
+            store = main.app.state.store
+            store.generation_history["gen-1"] = Generation(
+                id="gen-1", prompt="A notes app", status="completed", apk_path=str(apk_path), app_name="Notes"
+            )
+
+            first = client.get("/download/gen-1")
+            second = client.get("/download/gen-1", headers={"If-None-Match": first.headers["etag"]})
+            stale = client.get("/download/gen-1", headers={"If-None-Match": '"other"'})
+
+        assert first.status_code == 200
+        assert first.content == b"apk contents"
+        assert second.status_code == 304
+        assert second.content == b""
+        assert stale.status_code == 200
@@ -7,20 +7,48 @@ Tests all components of the AI-powered APK generation system
 import pytest
 import asyncio
 import json
+import hashlib
 import tempfile
 import shutil
+import threading
+import zipfile
+import sqlite3
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 from unittest.mock import Mock, patch, AsyncMock
+import httpx
+import openai
 import sys
 import os
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.text_to_apk_engine import TextToAPKEngine, AppSpecification, AppFramework, AppCategory
-from core.ai_engine.prompt_engineer import PromptEngineer, AIModel, PromptType
+from core.text_to_apk_engine import TextToAPKEngine, AppSpecification, AppFramework, AppCategory, ANALYSIS_INSTRUCTIONS
+from core.ai_engine.prompt_engineer import PromptEngineer, AIModel, AIResponse, PromptType, ModelSlots, ResponseCache
 from core.builders.react_native_builder import ReactNativeBuilder
 
+class CompletionStream:
+    """Minimal stand-in for a streamed chat completion"""
+    
+    def __init__(self, *parts, total_tokens=42):
+        self.chunks = [Mock(choices=[Mock(delta=Mock(content=part))], usage=None) for part in parts]
+        self.chunks.append(Mock(choices=[], usage=Mock(total_tokens=total_tokens)))
+        self.read = 0
+        self.closed = False
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self):
+        if self.closed or self.read == len(self.chunks):
+            raise StopAsyncIteration
+        self.read += 1
+        return self.chunks[self.read - 1]
+    
+    async def close(self):
+        self.closed = True
+
 class TestTextToAPKEngine:
     """Test suite for the main Text-to-APK engine"""
     
@@ -90,6 +118,83 @@ class TestTextToAPKEngine:
             mock_code.assert_called_once()
             mock_build.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_generate_apk_from_text_reports_progress(self, engine, sample_app_spec):
+        """Test that each pipeline stage reports progress through the callback"""
+        progress_updates = []
+        
+        async def progress_cb(progress, stage):
+            progress_updates.append((progress, stage))
+        
+        with patch.object(engine, 'analyze_prompt', return_value=sample_app_spec), \
+             patch.object(engine, 'generate_architecture', return_value={"components": []}), \
+             patch.object(engine, 'generate_source_code', return_value={"App.js": "code"}), \
+             patch.object(engine, 'build_apk', return_value={"apk_path": "/test.apk", "build_logs": [], "build_time": 1}):
+            
+            result = await engine.generate_apk_from_text("Create a calculator app", progress_cb=progress_cb)
+        
+        assert result["success"] is True
+        assert [progress for progress, _ in progress_updates] == [20, 40, 70, 90]
+    
+    @pytest.mark.asyncio
+    async def test_generate_apk_from_text_build_executor(self, engine, sample_app_spec):
+        """Test that the APK build can run in a separate process"""
+        with patch.object(engine, 'analyze_prompt', return_value=sample_app_spec), \
+             patch.object(engine, 'generate_architecture', return_value={"components": []}), \
+             patch.object(engine, 'build_apk') as mock_build, \
+             ProcessPoolExecutor(max_workers=1) as build_pool:
+            
+            result = await engine.generate_apk_from_text("Create a calculator app", build_executor=build_pool)
+        
+        assert result["success"] is True
+        assert result["apk_path"] == "path/to/app.apk"
+        mock_build.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_engine_owns_pooled_http2_client(self):
+        """Test that the engine pools OpenAI calls over its own HTTP/2 client"""
+        pytest.importorskip("h2")
+        engine = TextToAPKEngine(openai_api_key="test-key")
+        http = engine._http
+
+        assert engine._owns_http is True
+        await engine.aclose()
+        assert http.is_closed
+
+        shared = httpx.AsyncClient()
+        engine = TextToAPKEngine(openai_api_key="test-key", http_client=shared)
+        await engine.aclose()
+        assert not shared.is_closed
+        await shared.aclose()
+
+    @pytest.mark.asyncio
+    async def test_generate_apk_from_text_bounds_concurrent_builds(self, sample_app_spec):
+        """Test that concurrent generations overlap but builds are limited"""
+        engine = TextToAPKEngine(max_concurrent_builds=2)
+        running = 0
+        peak = 0
+        waiting = []
+
+        async def slow_build(app_spec, source_code):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            waiting.append(engine.builds_waiting)
+            assert engine.builds_running == running
+            await asyncio.sleep(0.01)
+            running -= 1
+            return {"apk_path": "/test.apk", "build_logs": [], "build_time": 1}
+
+        with patch.object(engine, 'analyze_prompt', return_value=sample_app_spec), \
+             patch.object(engine, 'build_apk', side_effect=slow_build):
+            results = await asyncio.gather(*(engine.generate_apk_from_text(f"App {i}") for i in range(5)))
+
+        assert all(result["success"] for result in results)
+        assert peak == 2
+        # Generations queue behind the running builds instead of exceeding the limit
+        assert max(waiting) > 0
+        assert engine.builds_running == engine.builds_waiting == 0
+
     @pytest.mark.asyncio
     async def test_generate_apk_from_text_failure(self, engine):
         """Test APK generation failure handling"""
@@ -103,6 +208,120 @@ class TestTextToAPKEngine:
             assert result["success"] is False
             assert "error" in result
     
+    @pytest.mark.asyncio
+    async def test_analyze_prompt_sends_static_instructions_first(self, engine):
+        """Test that the fixed instructions lead every request so providers can cache them"""
+        engine.openai_client = Mock()
+        with patch.object(engine, '_call_openai', AsyncMock(return_value='{"name": "Notes"}')) as mock_call:
+            await engine.analyze_prompt("Create a notes app", {"framework": "flutter"})
+            await engine.analyze_prompt("Create a weather app")
+
+        first, second = (call.args[0] for call in mock_call.call_args_list)
+        assert first[0] == second[0] == {"role": "system", "content": ANALYSIS_INSTRUCTIONS}
+        assert "Create a notes app" in first[1]["content"]
+        assert "flutter" in first[1]["content"]
+        assert "Create a weather app" in second[1]["content"]
+
+    @pytest.mark.asyncio
+    async def test_call_openai_caches_identical_requests(self, engine):
+        """Test that a repeated request is answered from the response cache"""
+        engine.openai_client = Mock()
+        engine.openai_client.chat.completions.create = AsyncMock(
+            side_effect=lambda **kwargs: CompletionStream('{"name": "Notes"}')
+        )
+
+        first = await engine.analyze_prompt("Create a notes app")
+        second = await engine.analyze_prompt("Create a notes app")
+        await engine.analyze_prompt("Create a weather app")
+
+        assert first == second
+        assert engine.openai_client.chat.completions.create.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_call_openai_stops_streaming_at_complete_object(self, engine):
+        """Test that the stream is closed once a complete JSON object has arrived"""
+        stream = CompletionStream('{"name": "Notes", ', '"tags": {"a": "}"}', '}', "\n\nThis app lets users...")
+        engine.openai_client = Mock()
+        engine.openai_client.chat.completions.create = AsyncMock(return_value=stream)
+
+        content = await engine._call_openai([{"role": "user", "content": "Create a notes app"}])
+
+        assert json.loads(content) == {"name": "Notes", "tags": {"a": "}"}}
+        assert stream.closed is True
+        assert stream.read == 3
+        assert engine.openai_client.chat.completions.create.call_args.kwargs["stream"] is True
+        # Usage never arrived, so the tokens are estimated from the streamed chunks
+        cached = next(iter(engine.response_cache._entries.values()))[1]
+        assert cached.tokens_used >= 3
+
+    @pytest.mark.asyncio
+    async def test_call_openai_does_not_cache_replies_without_json(self, engine):
+        """Test that prose or truncated replies are not served from the cache"""
+        engine.openai_client = Mock()
+        engine.openai_client.chat.completions.create = AsyncMock(
+            side_effect=lambda **kwargs: CompletionStream('Sure! {"name": "No')
+        )
+        messages = [{"role": "user", "content": "Create a notes app"}]
+
+        await engine._call_openai(messages)
+        await engine._call_openai(messages)
+
+        assert engine.openai_client.chat.completions.create.call_count == 2
+        assert len(engine.response_cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_call_openai_coalesces_concurrent_identical_requests(self, engine):
+        """Test that identical requests in flight at the same time share one API call"""
+        async def slow_create(**kwargs):
+            await asyncio.sleep(0.01)
+            return CompletionStream('{"name": "Notes"}')
+
+        engine.openai_client = Mock()
+        engine.openai_client.chat.completions.create = AsyncMock(side_effect=slow_create)
+
+        specs = await asyncio.gather(*(engine.analyze_prompt("Create a notes app") for _ in range(3)))
+
+        assert {spec.name for spec in specs} == {"Notes"}
+        assert engine.openai_client.chat.completions.create.call_count == 1
+        assert engine._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_analyze_prompt_templated_fast_path(self):
+        """Test that templated prompts skip the LLM when the fast path is enabled"""
+        engine = TextToAPKEngine(templated_fast_path=True)
+        engine.openai_client = Mock()
+        with patch.object(engine, '_call_openai', AsyncMock(return_value='{"name": "Weather"}')) as mock_call:
+            calculator = await engine.analyze_prompt("Create a simple calculator app with basic arithmetic operations")
+            weather = await engine.analyze_prompt("Build a weather app that shows current conditions")
+
+        assert calculator.name == "Simple Calculator App"
+        assert calculator.category == AppCategory.UTILITY
+        # No category keyword, so the prompt still goes to the LLM
+        assert weather.name == "Weather"
+        mock_call.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_generate_source_code_renders_templates_for_every_framework(self, engine, sample_app_spec):
+        """Test that every framework's source templates are fully substituted"""
+        for framework in AppFramework:
+            app_spec = AppSpecification(**{**sample_app_spec.__dict__, "framework": framework})
+            source_code = await engine.generate_source_code(app_spec, {})
+
+            rendered = "".join(source_code.values())
+            assert sample_app_spec.name in rendered
+            assert "${" not in rendered
+
+    @pytest.mark.asyncio
+    async def test_gradle_projects_enable_parallel_cached_builds(self, engine, sample_app_spec):
+        """Test that Gradle-based frameworks ship tuned gradle.properties"""
+        for framework, path in ((AppFramework.REACT_NATIVE, "android/gradle.properties"),
+                                (AppFramework.NATIVE_ANDROID, "gradle.properties")):
+            app_spec = AppSpecification(**{**sample_app_spec.__dict__, "framework": framework})
+            source_code = await engine.generate_source_code(app_spec, {})
+
+            assert "org.gradle.parallel=true" in source_code[path]
+            assert "org.gradle.caching=true" in source_code[path]
+
     def test_fallback_prompt_analysis(self, engine):
         """Test fallback prompt analysis when AI is unavailable"""
         prompt = "Create a todo list app with categories"
@@ -191,6 +410,21 @@ class TestPromptEngineer:
             assert "error" in result
             assert "raw_response" in result
     
+    @pytest.mark.asyncio
+    async def test_analyze_app_prompt_leaves_cached_response_untouched(self, prompt_engineer):
+        """Test that validating a cached specification doesn't modify the cache entry"""
+        content = '{"name": "Notes", "category": "unknown", "framework": "flutter"}'
+        
+        with patch.object(prompt_engineer, '_call_openai', AsyncMock(return_value={"content": content, "tokens_used": 5})) as mock_call:
+            first = await prompt_engineer.analyze_app_prompt("Create a notes app")
+            second = await prompt_engineer.analyze_app_prompt("Create a notes app")
+        
+        cached = next(iter(prompt_engineer.response_cache._entries.values()))[1]
+        assert mock_call.call_count == 1
+        assert first["app_specification"] == second["app_specification"]
+        assert second["app_specification"]["category"] == "utility"
+        assert cached.parsed == json.loads(content)
+    
     @pytest.mark.asyncio
     async def test_generate_architecture(self, prompt_engineer):
         """Test architecture generation"""
@@ -219,6 +453,271 @@ class TestPromptEngineer:
             assert "architecture" in result
             assert len(result["architecture"]["components"]) == 3
     
+    @pytest.mark.asyncio
+    async def test_call_openai_streams_response(self, prompt_engineer):
+        """Test that streamed completion chunks are joined and prose is rejected early"""
+        def make_stream(*parts):
+            async def stream():
+                for part in parts:
+                    yield Mock(choices=[Mock(delta=Mock(content=part))], usage=None)
+                yield Mock(choices=[], usage=Mock(total_tokens=42))
+            return stream()
+        
+        prompt_engineer.openai_client = Mock()
+        prompt_engineer.openai_client.chat.completions.create = AsyncMock(
+            return_value=make_stream(" ", '{"name": ', '"Test App"}')
+        )
+        
+        result = await prompt_engineer._call_openai("gpt-4", "prompt", 100, 0.5)
+        
+        assert json.loads(result["content"]) == {"name": "Test App"}
+        assert result["tokens_used"] == 42
+        assert prompt_engineer.openai_client.chat.completions.create.call_args.kwargs["stream"] is True
+        
+        prompt_engineer.openai_client.chat.completions.create = AsyncMock(
+            return_value=make_stream("Sure! Here is", " your app")
+        )
+        
+        with pytest.raises(ValueError):
+            await prompt_engineer._call_openai("gpt-4", "prompt", 100, 0.5)
+    
+    @pytest.mark.asyncio
+    async def test_create_completion_retries_rate_limits(self, prompt_engineer):
+        """Test that a 429 is retried on the same model after Retry-After"""
+        throttled = openai.RateLimitError(
+            "Rate limit reached",
+            response=httpx.Response(429, headers={"retry-after": "0"}, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions")),
+            body=None
+        )
+        prompt_engineer.openai_client = Mock()
+        prompt_engineer.openai_client.chat.completions.create = AsyncMock(side_effect=[throttled, "stream"])
+        
+        result = await prompt_engineer._create_completion(100, model="gpt-4", messages=[])
+        
+        assert result == "stream"
+        assert prompt_engineer.openai_client.chat.completions.create.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_execute_prompt_hedges_slow_preferred_model(self, prompt_engineer):
+        """Test that a slow preferred model is hedged with the next one after the delay"""
+        cancelled = []
+        
+        async def fake_call_openai(model, prompt, max_tokens, temperature):
+            if model == AIModel.GPT_4_TURBO.value:
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.append(model)
+                    raise
+            return {"content": '{"name": "Fast App"}', "tokens_used": 10}
+        
+        template = prompt_engineer.templates_cache["app_analysis"]
+        with patch('core.ai_engine.prompt_engineer.HEDGE_DEFAULT_DELAY', 0.05), \
+             patch.object(prompt_engineer, '_call_openai', side_effect=fake_call_openai):
+            response = await asyncio.wait_for(
+                prompt_engineer._execute_prompt(template, {"prompt": "Enterprise race app", "preferences": "{}"}),
+                timeout=2
+            )
+        
+        assert response.model == AIModel.GPT_4
+        assert cancelled == [AIModel.GPT_4_TURBO.value]
+    
+    @pytest.mark.asyncio
+    async def test_execute_prompt_fast_model_is_not_hedged(self, prompt_engineer):
+        """Test that a model answering within its p90 latency is the only one queried"""
+        prompt_engineer._latencies[AIModel.GPT_4_TURBO].extend([0.5] * 9 + [1.0])
+        
+        async def fake_call_openai(model, prompt, max_tokens, temperature):
+            await asyncio.sleep(0.01)
+            return {"content": '{"name": "Fast App"}', "tokens_used": 10}
+        
+        template = prompt_engineer.templates_cache["app_analysis"]
+        with patch.object(prompt_engineer, '_call_openai', side_effect=fake_call_openai) as mock_call:
+            response = await prompt_engineer._execute_prompt(template, {"prompt": "Enterprise race app", "preferences": "{}"})
+        
+        assert response.model == AIModel.GPT_4_TURBO
+        assert [call.kwargs["model"] for call in mock_call.call_args_list] == [AIModel.GPT_4_TURBO.value]
+        assert 0.5 < prompt_engineer._hedge_delay(AIModel.GPT_4_TURBO) <= 1.0
+    
+    @pytest.mark.asyncio
+    async def test_execute_prompt_race_skips_unparseable_replies(self, prompt_engineer):
+        """Test that a fast prose reply doesn't beat a slower valid JSON one"""
+        async def fake_call_openai(model, prompt, max_tokens, temperature):
+            if model == AIModel.GPT_4_TURBO.value:
+                return {"content": "Sure! Here is your app", "tokens_used": 5}
+            await asyncio.sleep(0.01)
+            return {"content": '{"name": "Valid App"}', "tokens_used": 10}
+        
+        template = prompt_engineer.templates_cache["app_analysis"]
+        with patch.object(prompt_engineer, '_call_openai', side_effect=fake_call_openai):
+            response = await prompt_engineer._execute_prompt(template, {"prompt": "Enterprise race app", "preferences": "{}"})
+        
+        assert response.model == AIModel.GPT_4
+        assert response.parsed == {"name": "Valid App"}
+    
+    @pytest.mark.asyncio
+    async def test_execute_prompt_routes_simple_prompts_to_cheap_model(self, prompt_engineer):
+        """Test that short analysis prompts start on the cheap tier and escalate when weak"""
+        template = prompt_engineer.templates_cache["app_analysis"]
+        
+        assert prompt_engineer._pick_model(template, {"prompt": "A todo list app"})[0] == AIModel.GPT_3_5_TURBO
+        assert prompt_engineer._pick_model(template, {"prompt": "An enterprise CRM app"})[0] == AIModel.GPT_4_TURBO
+        
+        with patch.object(prompt_engineer, '_call_openai', AsyncMock(return_value={"content": '{"name": "Todo"}', "tokens_used": 5})) as mock_call:
+            response = await prompt_engineer._execute_prompt(template, {"prompt": "A todo list app", "preferences": "{}"})
+        
+        assert response.model == AIModel.GPT_3_5_TURBO
+        assert mock_call.call_count == 1
+        
+        async def fake_call_openai(model, prompt, max_tokens, temperature):
+            if model == AIModel.GPT_3_5_TURBO.value:
+                return {"content": "not json", "tokens_used": 5}
+            return {"content": '{"name": "Notes"}', "tokens_used": 10}
+        
+        with patch.object(prompt_engineer, '_call_openai', side_effect=fake_call_openai):
+            response = await prompt_engineer._execute_prompt(template, {"prompt": "A notes app", "preferences": "{}"})
+        
+        assert response.model == AIModel.GPT_4_TURBO
+    
+    @pytest.mark.asyncio
+    async def test_analyze_app_prompts_batch_resumes_from_checkpoint(self, prompt_engineer):
+        """Test that batch analysis skips finished prompts and appends new results"""
+        def result_line(custom_id, content):
+            body = {"choices": [{"message": {"content": content}}]}
+            return json.dumps({"custom_id": custom_id, "response": {"status_code": 200, "body": body}})
+        
+        client = Mock()
+        client.files.create = AsyncMock(return_value=Mock(id="file-in"))
+        client.batches.create = AsyncMock(return_value=Mock(id="batch-1", status="validating"))
+        client.batches.retrieve = AsyncMock(return_value=Mock(id="batch-1", status="completed", output_file_id="file-out"))
+        client.files.content = AsyncMock(return_value=Mock(text="\n".join([
+            result_line("1", json.dumps({"name": "Notes", "description": "Notes app", "category": "productivity", "framework": "flutter", "features": []})),
+            result_line("2", "not json")
+        ])))
+        prompt_engineer.openai_client = client
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = Path(temp_dir) / "specs.jsonl"
+            output.write_text(json.dumps({"custom_id": "0", "prompt": "Done", "app_specification": {}}) + "\n")
+            
+            result = await prompt_engineer.analyze_app_prompts_batch(["Done", "A notes app", "A broken app"], output, poll_interval=0)
+            
+            uploaded = client.files.create.call_args.kwargs["file"][1].decode().splitlines()
+            lines = [json.loads(line) for line in output.read_text().splitlines()]
+            checkpoint_left = (Path(temp_dir) / "specs.jsonl.batch").exists()
+        
+        assert result == {"completed": 1, "failed": 1}
+        assert [json.loads(line)["custom_id"] for line in uploaded] == ["1", "2"]
+        assert [line["custom_id"] for line in lines] == ["0", "1"]
+        assert lines[1]["app_specification"]["name"] == "Notes"
+        assert not checkpoint_left
+    
+    @pytest.mark.asyncio
+    async def test_response_cache_persists_across_instances(self):
+        """Test that a disk-backed cache serves responses written by another instance"""
+        template_args = {"prompt": "Persistent cache app", "preferences": "{}"}
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_path = Path(temp_dir) / "responses.db"
+            
+            writer = PromptEngineer(cache_path=cache_path)
+            template = writer.templates_cache["app_analysis"]
+            with patch.object(writer, '_call_openai', AsyncMock(return_value={"content": '{"name": "Disk"}', "tokens_used": 5})):
+                first = await writer._execute_prompt(template, template_args)
+            await writer.aclose()
+            
+            reader = PromptEngineer(cache_path=cache_path)
+            with patch.object(reader, '_call_openai', AsyncMock()) as mock_call:
+                second = await reader._execute_prompt(template, template_args)
+            await reader.aclose()
+        
+        mock_call.assert_not_called()
+        assert second.content == first.content
+        assert second.model == first.model
+        assert second.parsed == {"name": "Disk"}
+        assert second.response_time == 0.0
+    
+    @pytest.mark.asyncio
+    async def test_response_cache_treats_locked_database_as_miss(self):
+        """Test that another worker holding the database lock doesn't fail or stall requests"""
+        response = AIResponse(content='{"name": "Busy"}', model=AIModel.GPT_4, prompt_hash="h", tokens_used=5, response_time=0.1)
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_path = Path(temp_dir) / "responses.db"
+            cache = ResponseCache(path=cache_path)
+            other_worker = sqlite3.connect(str(cache_path), isolation_level=None)
+            other_worker.execute("BEGIN EXCLUSIVE")
+            
+            await asyncio.wait_for(cache.set("busy", response), timeout=2)
+            
+            other_worker.execute("ROLLBACK")
+            other_worker.close()
+            cache._entries.clear()
+            missed = await cache.get("busy")
+            cache.close()
+        
+        assert missed is None
+    
+    @pytest.mark.asyncio
+    async def test_model_slots_fail_fast_when_queue_is_full(self, prompt_engineer):
+        """Test that requests beyond a model's wait queue fail instead of piling up"""
+        prompt_engineer._model_slots[AIModel.GPT_4] = ModelSlots(max_concurrent=1, max_waiting=0)
+        template = prompt_engineer.templates_cache["app_analysis"]
+        release = asyncio.Event()
+        
+        async def slow_call_openai(model, prompt, max_tokens, temperature):
+            await release.wait()
+            return {"content": '{"name": "Slow"}', "tokens_used": 10}
+        
+        with patch.object(prompt_engineer, '_call_openai', side_effect=slow_call_openai):
+            first = asyncio.create_task(prompt_engineer._call_model(AIModel.GPT_4, "p", "h", template))
+            await asyncio.sleep(0)
+            with pytest.raises(Exception, match="overloaded"):
+                await prompt_engineer._call_model(AIModel.GPT_4, "p", "h", template)
+            release.set()
+            assert (await first).model == AIModel.GPT_4
+    
+    @pytest.mark.asyncio
+    async def test_execute_prompt_uses_bounded_cache(self, prompt_engineer):
+        """Test that repeated prompts hit the cache and old entries are evicted"""
+        prompt_engineer.response_cache.maxsize = 2
+        template = prompt_engineer.templates_cache["app_analysis"]
+        
+        with patch.object(prompt_engineer, '_call_openai', AsyncMock(return_value={"content": '{"name": "App"}', "tokens_used": 5})) as mock_call:
+            first = await prompt_engineer._execute_prompt(template, {"prompt": "Cached app", "preferences": "{}"})
+            calls_after_miss = mock_call.call_count
+            second = await prompt_engineer._execute_prompt(template, {"prompt": "Cached app", "preferences": "{}"})
+            calls_after_hit = mock_call.call_count
+            
+            for prompt in ("Other app one", "Other app two"):
+                await prompt_engineer._execute_prompt(template, {"prompt": prompt, "preferences": "{}"})
+        
+        assert second.content == first.content
+        assert second.response_time == 0.0
+        assert calls_after_hit == calls_after_miss
+        assert len(prompt_engineer.response_cache) == 2
+        assert await prompt_engineer.response_cache.get(first.prompt_hash) is None
+    
+    @pytest.mark.asyncio
+    async def test_generate_code_components(self, prompt_engineer):
+        """Test batched component generation with a shared prompt prefix"""
+        app_spec = {"name": "Test App", "framework": "react_native"}
+        architecture = {"components": ["Header", "Footer"]}
+        prompts = []
+        
+        async def fake_execute(template, variables, max_tokens=None):
+            prompts.append(template.render(variables))
+            if variables["component"] == "Broken":
+                raise Exception("All AI models failed to respond")
+            return Mock(content=json.dumps({"files": {f"{variables['component']}.js": ""}}), model=AIModel.GPT_4, response_time=1.0)
+        
+        with patch.object(prompt_engineer, '_execute_prompt', side_effect=fake_execute):
+            results = await prompt_engineer.generate_code_components(app_spec, architecture, ["Header", "Footer", "Broken"])
+        
+        assert [result["success"] for result in results] == [True, True, False]
+        assert "Header.js" in results[0]["code"]["files"]
+        assert prompts[0].rsplit("Header", 1)[0] == prompts[1].rsplit("Footer", 1)[0]
+    
     def test_calculate_confidence_valid_json(self, prompt_engineer):
         """Test confidence calculation for valid JSON"""
         template = Mock()
@@ -255,6 +754,15 @@ class TestPromptEngineer:
         assert validated_spec["framework"] == "react_native"  # Default fallback
         assert "description" in validated_spec
         assert "features" in validated_spec
+    
+    def test_analysis_template_lists_valid_values(self, prompt_engineer):
+        """Test that the analysis prompt is built from the same sets validation uses"""
+        template = prompt_engineer.templates_cache["app_analysis"]
+        
+        assert template.variables == ("prompt", "preferences")
+        assert "{valid_categories}" not in template.template
+        for value in template.constraints["valid_categories"] | template.constraints["valid_frameworks"]:
+            assert value in template.template
 
 class TestReactNativeBuilder:
     """Test suite for the React Native builder"""
@@ -322,6 +830,138 @@ class TestReactNativeBuilder:
             assert package_data["name"] == builder._sanitize_project_name(sample_app_spec["name"])
             assert "react-native" in package_data["dependencies"]
     
+    @pytest.mark.asyncio
+    async def test_generate_core_files_ships_cached_lockfile(self, builder, sample_app_spec):
+        """Test that a lockfile cached for the same dependencies is copied into the project"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first_path = Path(temp_dir) / "first"
+            second_path = Path(temp_dir) / "second"
+            first_path.mkdir()
+            second_path.mkdir()
+            
+            files = await builder._generate_core_files(first_path, sample_app_spec)
+            assert "package-lock.json" not in files
+            
+            package_json = json.loads((first_path / "package.json").read_text())
+            (first_path / "package-lock.json").write_text('{"lockfileVersion": 3}')
+            builder._cache_lockfile(first_path / "package-lock.json", builder._dependencies_hash(package_json))
+            
+            files = await builder._generate_core_files(second_path, sample_app_spec)
+            
+            assert "package-lock.json" in files
+            assert (second_path / "package-lock.json").read_text() == '{"lockfileVersion": 3}'
+            # The cache is runtime state: it lives with the builds, not the package sources
+            assert builder.locks_dir.is_relative_to(builder.build_dir)
+    
+    @pytest.mark.asyncio
+    async def test_generate_android_files_copies_cached_skeleton(self, builder, sample_app_spec):
+        """Test that projects with the same name reuse one rendered skeleton without sharing files"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first_path = Path(temp_dir) / "first"
+            second_path = Path(temp_dir) / "second"
+            
+            first_files = await builder._generate_android_files(first_path, sample_app_spec)
+            second_files = await builder._generate_android_files(second_path, sample_app_spec)
+            
+            manifest = "android/app/src/main/AndroidManifest.xml"
+            package_name = f"com.singularity.{builder._sanitize_project_name(sample_app_spec['name'])}"
+            
+            assert first_files == second_files
+            assert "android/gradle.properties" in second_files
+            assert package_name in (second_path / manifest).read_text()
+            
+            # Editing one project's file leaves the cache and other projects alone
+            (first_path / manifest).write_text("edited")
+            third_path = Path(temp_dir) / "third"
+            await builder._generate_android_files(third_path, sample_app_spec)
+            assert package_name in (second_path / manifest).read_text()
+            assert package_name in (third_path / manifest).read_text()
+
+    @pytest.mark.asyncio
+    async def test_generate_android_files_emits_release_optimizations(self, builder, sample_app_spec):
+        """Test that release builds are split per ABI, minified with R8 and use Hermes"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            project_path = Path(temp_dir)
+            await builder._generate_android_files(project_path, sample_app_spec)
+
+            app_gradle = (project_path / "android/app/build.gradle").read_text()
+            gradle_properties = (project_path / "android/gradle.properties").read_text()
+
+            assert "def enableSeparateBuildPerCPUArchitecture = true" in app_gradle
+            assert "def enableProguardInReleaseBuilds = true" in app_gradle
+            assert "def enableHermes =" in app_gradle
+            assert "android.enableR8.fullMode=true" in gradle_properties
+            assert "hermesEnabled=true" in gradle_properties
+            assert "reactNativeArchitectures=arm64-v8a,armeabi-v7a" in gradle_properties
+
+    @pytest.mark.asyncio
+    async def test_build_apk_returns_split_apk_for_gradle_config(self, builder, sample_app_spec):
+        """Test that toolchain builds return the per-ABI APKs the ABI split produces"""
+        builder.run_toolchain = True
+        
+        async def fake_gradle(project_path, *command, cwd=None, env=None):
+            debug_dir = cwd / "app/build/outputs/apk/debug"
+            debug_dir.mkdir(parents=True)
+            for abi in properties["reactNativeArchitectures"].split(","):
+                (debug_dir / f"app-{abi}-debug.apk").write_bytes(b"apk")
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            project_path = Path(temp_dir)
+            await builder._generate_android_files(project_path, sample_app_spec)
+            app_gradle = (project_path / "android/app/build.gradle").read_text()
+            properties = dict(
+                line.split("=", 1) for line in (project_path / "android/gradle.properties").read_text().splitlines() if "=" in line
+            )
+            
+            with patch.object(builder, '_install_dependencies'), \
+                 patch.object(builder, '_run_command', side_effect=fake_gradle):
+                result = await builder.build_apk(temp_dir, sample_app_spec)
+            
+            assert (project_path / "android/app/proguard-rules.pro").exists()
+        
+        assert "enable enableSeparateBuildPerCPUArchitecture" in app_gradle
+        assert "universalApk false" in app_gradle
+        assert result["success"] is True
+        assert Path(result["apk_path"]).name == "app-arm64-v8a-debug.apk"
+        assert sorted(result["abi_apks"]) == sorted(properties["reactNativeArchitectures"].split(","))
+    
+    @pytest.mark.asyncio
+    async def test_file_io_runs_on_bounded_thread_pool(self, builder):
+        """Test that blocking file IO uses the builder's own bounded thread pool"""
+        thread_name = await builder._run_io(lambda: threading.current_thread().name)
+
+        assert thread_name.startswith("rnb-io")
+        assert builder._io_executor._max_workers <= 32
+
+        builder.shutdown()
+        assert builder._io_executor is None
+
+    def test_ensure_dir_creates_each_directory_once(self, builder):
+        """Test that repeat builds skip the mkdir for directories already created"""
+        target = builder.build_dir / "cache/skeleton"
+
+        builder._ensure_dir(target)
+        with patch.object(Path, "mkdir") as mock_mkdir:
+            builder._ensure_dir(target)
+
+        assert target.is_dir()
+        mock_mkdir.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_generate_many_uses_worker_processes(self, builder, sample_app_spec, sample_architecture):
+        """Test that several projects are generated through a process pool"""
+        other_spec = {**sample_app_spec, "name": "Other App"}
+        
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            results = await builder.generate_many(
+                [(sample_app_spec, sample_architecture), (other_spec, sample_architecture)],
+                executor=pool
+            )
+        
+        assert [result["success"] for result in results] == [True, True]
+        assert Path(results[1]["project_path"]).name.startswith("OtherApp_")
+        assert (Path(results[0]["project_path"]) / "package.json").exists()
+    
     @pytest.mark.asyncio
     async def test_generate_source_files(self, builder, sample_app_spec, sample_architecture):
         """Test source files generation"""
@@ -370,6 +1010,104 @@ class TestReactNativeBuilder:
                 mock_install.assert_called_once()
                 mock_build.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_build_android_apk_writes_prebuilt_mock_apk(self, builder, sample_app_spec):
+        """Test that every mock build writes the same valid APK archive"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first_apk = await builder._build_android_apk(Path(temp_dir) / "first", sample_app_spec)
+            second_apk = await builder._build_android_apk(Path(temp_dir) / "second", sample_app_spec)
+            
+            assert first_apk.read_bytes() == second_apk.read_bytes()
+            assert first_apk.stat().st_ino == second_apk.stat().st_ino == builder.mock_apk_template.stat().st_ino
+            assert builder._known_dirs == {builder.mock_apk_template.parent}
+            with zipfile.ZipFile(first_apk) as apk_zip:
+                assert apk_zip.namelist() == ["AndroidManifest.xml", "classes.dex", "resources.arsc"]
+                assert apk_zip.testzip() is None
+    
+    @pytest.mark.asyncio
+    async def test_build_apk_hashes_artifact_in_background(self, builder, sample_app_spec):
+        """Test that APK size and digest are available after build_apk returns"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with patch.object(builder, '_install_dependencies'):
+                result = await builder.build_apk(temp_dir, sample_app_spec)
+            
+            info = await builder.artifact_info(result["apk_path"])
+            apk_bytes = Path(result["apk_path"]).read_bytes()
+        
+        assert info == {"size": len(apk_bytes), "sha256": hashlib.sha256(apk_bytes).hexdigest()}
+        assert await builder.artifact_info(result["apk_path"]) is None
+    
+    @pytest.mark.asyncio
+    async def test_build_apk_bounds_unclaimed_artifact_info(self, builder, sample_app_spec):
+        """Test that artifact info nobody asks for doesn't accumulate"""
+        with tempfile.TemporaryDirectory() as temp_dir, \
+             patch("core.builders.react_native_builder.ARTIFACT_INFO_ENTRIES", 2), \
+             patch.object(builder, '_install_dependencies'):
+            results = [
+                await builder.build_apk(temp_dir, {**sample_app_spec, "name": f"App {i}"})
+                for i in range(3)
+            ]
+            
+            assert list(builder._artifact_info) == [result["apk_path"] for result in results[1:]]
+            assert await builder.artifact_info(results[0]["apk_path"]) is None
+            assert (await builder.artifact_info(results[2]["apk_path"]))["size"] > 0
+    
+    @pytest.mark.asyncio
+    async def test_install_dependencies_skips_simulated_delay_by_default(self, builder):
+        """Test that simulated installs only sleep when delays are requested"""
+        with tempfile.TemporaryDirectory() as temp_dir, \
+             patch("core.builders.react_native_builder.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            await builder._install_dependencies(Path(temp_dir))
+            mock_sleep.assert_not_called()
+
+            builder.simulate_delays = True
+            await builder._install_dependencies(Path(temp_dir))
+            mock_sleep.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_install_dependencies_shares_node_modules(self, builder, sample_app_spec):
+        """Test that projects with the same dependencies share installed files but not directories"""
+        builder.run_toolchain = True
+        
+        async def fake_npm(project_path, *command, cwd=None, env=None):
+            (cwd / "node_modules" / "react").mkdir(parents=True)
+            (cwd / "node_modules" / "react" / "index.js").write_text("module.exports = {}")
+        
+        with tempfile.TemporaryDirectory() as temp_dir, \
+             patch.object(builder, '_run_command', side_effect=fake_npm) as mock_npm:
+            projects = [Path(temp_dir) / "first", Path(temp_dir) / "second"]
+            for project_path in projects:
+                project_path.mkdir()
+                await builder._generate_core_files(project_path, sample_app_spec)
+                await builder._install_dependencies(project_path)
+            
+            first_react, second_react = (project_path / "node_modules" / "react" for project_path in projects)
+            # Build outputs written under one project's node_modules stay in that project
+            (first_react / "android" / "build").mkdir(parents=True)
+            
+            assert mock_npm.call_count == 1
+            assert not (projects[0] / "node_modules").is_symlink()
+            assert (first_react / "index.js").stat().st_ino == (second_react / "index.js").stat().st_ino
+            assert (second_react / "index.js").stat().st_mode & 0o222 == 0
+            assert not (second_react / "android").exists()
+    
+    @pytest.mark.asyncio
+    async def test_aclose_stops_only_its_own_gradle_daemon(self, builder):
+        """Test that builders sharing a Gradle home stop only their own daemons"""
+        other = ReactNativeBuilder(build_dir=builder.build_dir)
+        builder._gradle_daemon = ("gradle", builder.build_dir)
+        
+        with patch("core.builders.react_native_builder.asyncio.create_subprocess_exec",
+                   new_callable=AsyncMock) as mock_exec:
+            mock_exec.return_value.wait = AsyncMock(return_value=0)
+            await builder.aclose()
+        
+        env = mock_exec.call_args.kwargs["env"]
+        assert mock_exec.call_args.args == ("gradle", "--stop")
+        assert env["GRADLE_USER_HOME"] == other._gradle_env()["GRADLE_USER_HOME"]
+        assert f"-Dorg.gradle.daemon.registry.base={builder.gradle_daemon_registry}" in env["GRADLE_OPTS"]
+        assert builder.gradle_daemon_registry != other.gradle_daemon_registry
+    
     def test_sanitize_project_name(self, builder):
         """Test project name sanitization"""
         test_cases = [
@@ -377,6 +1115,7 @@ class TestReactNativeBuilder:
             ("App with 123 numbers", "Appwith123numbers"),
             ("Special!@#$%Characters", "SpecialCharacters"),
             ("123StartWithNumber", "App123StartWithNumber"),
+            ("Café Ünïcode Äpp", "Cafncodepp"),
             ("", "GeneratedApp")
         ]
         
@@ -395,6 +1134,35 @@ class TestReactNativeBuilder:
             assert len(logs) > 0
             assert any("build" in log.lower() for log in logs)
 
+    def test_get_build_logs_reads_gradle_reports_only(self, builder):
+        """Test that Gradle report files are collected without scanning node_modules"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            project_path = Path(temp_dir)
+            reports_dir = project_path / "android/build/reports/problems"
+            reports_dir.mkdir(parents=True)
+            (reports_dir / "problems.txt").write_text("deprecated API used\n")
+            (project_path / "node_modules").mkdir()
+            (project_path / "node_modules/build.log").write_text("should not be read\n")
+
+            logs = builder._get_build_logs(project_path)
+
+            assert "--- problems.txt ---" in logs
+            assert "deprecated API used" in logs
+            assert "should not be read" not in logs
+
+    @pytest.mark.asyncio
+    async def test_run_command_streams_output_to_build_logs(self, builder):
+        """Test that tool output is captured per project and failures raise"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            project_path = Path(temp_dir)
+            
+            await builder._run_command(project_path, sys.executable, "-c", "print('Compiling'); print('Done')")
+            with pytest.raises(Exception, match="status 3"):
+                await builder._run_command(project_path, sys.executable, "-c", "print('Failing'); raise SystemExit(3)")
+            
+            assert builder._get_build_logs(project_path) == ["Compiling", "Done", "Failing"]
+            assert builder._get_build_logs(project_path) == builder._get_build_logs(Path(temp_dir) / "other")
+
 class TestIntegration:
     """Integration tests for the complete system"""
     
@@ -406,21 +1174,18 @@ class TestIntegration:
         
         with patch.object(engine, 'openai_client') as mock_openai:
             # Mock OpenAI response
-            mock_openai.ChatCompletion.acreate = AsyncMock(return_value=Mock(
-                choices=[Mock(message=Mock(content=json.dumps({
-                    "name": "Notes App",
-                    "description": "Simple note-taking application",
-                    "category": "productivity",
-                    "framework": "react_native",
-                    "features": ["notes", "categories", "search"],
-                    "ui_style": "clean",
-                    "target_audience": "students",
-                    "complexity_level": 4,
-                    "api_integrations": [],
-                    "permissions": ["WRITE_EXTERNAL_STORAGE"]
-                })))],
-                usage=Mock(total_tokens=500)
-            ))
+            mock_openai.chat.completions.create = AsyncMock(side_effect=lambda **kwargs: CompletionStream(json.dumps({
+                "name": "Notes App",
+                "description": "Simple note-taking application",
+                "category": "productivity",
+                "framework": "react_native",
+                "features": ["notes", "categories", "search"],
+                "ui_style": "clean",
+                "target_audience": "students",
+                "complexity_level": 4,
+                "api_integrations": [],
+                "permissions": ["WRITE_EXTERNAL_STORAGE"]
+            }), total_tokens=500))
             
             with patch('core.builders.react_native_builder.ReactNativeBuilder') as mock_builder_class:
                 mock_builder = Mock()